@@ -1,68 +1,268 @@
 import random
+import time
+
+from mcts import MCTSSearch
+from patterns import capture_value
+from profiling import environment_profiler
+from stats import SearchStats
+from tactics import ThreatReport, scan_threats
+from threatspace import ThreatSpaceSearch
+from transposition import EXACT, LOWER, UPPER, TranspositionTable
+
+WIN_SCORE = 1000000  # Puntuación de una victoria (se resta la distancia en plies)
+MAX_DEPTH = 32
+TIME_CHECK_NODES = 8  # Cada cuántos nodos se consulta el reloj (un nodo cuesta mucho más)
+THREAT_TIME_SHARE = 0.5  # Parte máxima del tiempo restante para la búsqueda de amenazas
+
+# Prioridades de ordenación de movimientos (de mayor a menor)
+ORDER_HASH = 1 << 40
+ORDER_WIN = 1 << 39
+ORDER_BLOCK_FOUR = 1 << 38
+ORDER_CAPTURE = 1 << 37
+ORDER_KILLER = 1 << 36
+
+EVALUATORS = ("patterns", "material")
+ENGINES = ("alphabeta", "mcts")
+
+
+class SearchTimeout(Exception):
+    """Se lanza dentro de la búsqueda cuando se agota el tiempo asignado."""
+
+
+def _remaining(deadline):
+    """Segundos que quedan hasta deadline (None = sin límite), nunca negativos."""
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.perf_counter())
+
+
+def _no_lap(phase):
+    """Sustituto de SearchStats.lap cuando no se recogen estadísticas."""
+
 
 class AIPlayer:
-    def __init__(self, name, symbol):
+    def __init__(self, name, symbol, tt_entries=None, tt_megabytes=None, max_depth=MAX_DEPTH,
+                 evaluator="patterns", workers=1, tt=None, threat_nodes=3000, threat_time=0.05,
+                 engine="alphabeta", playouts=None, mcts_nodes=200000, vectorized=False, stats=False,
+                 profiler=None):
         """
         Inicializa a la IA.
         :param name: Nombre de la IA.
         :param symbol: Símbolo de la IA ('X' o 'O').
+        :param tt_entries: Tamaño de la tabla de transposiciones en entradas.
+        :param tt_megabytes: Tamaño de la tabla de transposiciones en MB aproximados.
+        :param max_depth: Profundidad máxima de la profundización iterativa.
+        :param evaluator: 'patterns' (incremental por líneas) o 'material' (recuento de fichas).
+        :param workers: Procesos para repartir la búsqueda de la raíz (1 = sin paralelismo).
+        :param tt: Tabla de transposiciones ya creada (por ejemplo, una SharedTranspositionTable).
+        :param threat_nodes: Nodos de la búsqueda de victorias forzadas (0 = desactivada).
+        :param threat_time: Segundos de la búsqueda de victorias forzadas.
+        :param engine: 'alphabeta' (profundización iterativa) o 'mcts' (Monte Carlo con UCT).
+        :param playouts: Simulaciones máximas por movimiento con 'mcts' (None = solo tiempo).
+        :param mcts_nodes: Capacidad del árbol de 'mcts'.
+        :param vectorized: Si es True, el análisis táctico usa features.py (requiere numpy).
+        :param stats: Si es True, cada get_best_move deja un SearchStats en last_stats
+                      y lo suma a game_stats (desactivado no cuesta nada).
+        :param profiler: profiling.Profiler que mide cada movimiento (None = el de la
+                         variable de entorno GOMOKU_PROFILE, si está definida).
         """
+        if evaluator not in EVALUATORS:
+            raise ValueError(f"Evaluador desconocido: {evaluator}")
+        if engine not in ENGINES:
+            raise ValueError(f"Motor desconocido: {engine}")
         self.name = name
         self.symbol = symbol
+        self.evaluator = evaluator
+        self.workers = workers
+        self.parallel = None
+        self.engine = engine
+        self.playouts = playouts
+        # El árbol de Monte Carlo se reutiliza entre turnos
+        self.mcts = MCTSSearch(max_nodes=mcts_nodes) if engine == "mcts" else None
+        self.scan_threats = scan_threats
+        if vectorized:
+            from features import scan_features
+            self.scan_threats = scan_features
+        self.iterations = []
+        self.threat_search = ThreatSpaceSearch(node_limit=threat_nodes, time_limit=threat_time)
+        self.max_depth = max_depth
+        self.nodes = 0
+        self.deadline = None
+        # Ordenación: dos movimientos asesinos por ply y tabla de historia entre turnos
+        self.killers = [[None, None] for _ in range(max_depth + 1)]
+        self.history = {}
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        # Contadores de la búsqueda para las estadísticas
+        self.completed_depth = 0
+        self.max_ply = 0
+        self.expanded = 0
+        self.children = 0
+        self.leaves = 0
+        self.evaluate_seconds = 0.0
+        self.collect_stats = stats
+        self.last_stats = None
+        self.game_stats = SearchStats() if stats else None
+        if stats:
+            # Solo con estadísticas se mide cada evaluación
+            self.evaluate_board = self._timed_evaluate_board
+        self.profiler = profiler if profiler is not None else environment_profiler()
+        # Se conserva entre llamadas a get_best_move durante toda la partida
+        if tt is None:
+            tt = TranspositionTable(entries=tt_entries, megabytes=tt_megabytes)
+        self.tt = tt
 
-    def get_best_move(self, board):
+    def get_best_move(self, board, time_limit=0.5, return_stats=False):
         """
         Determina el mejor movimiento para la IA siguiendo las reglas especificadas.
         :param board: Instancia del tablero (clase Board).
-        :return: Una tupla (fila, columna) que representa el movimiento elegido.
+        :param time_limit: Segundos disponibles para todo el movimiento, del análisis
+                           táctico a la búsqueda (None = sin límite).
+        :param return_stats: Si es True, devuelve también las estadísticas de la
+                             decisión (None si la IA no las recoge).
+        :return: Una tupla (fila, columna) que representa el movimiento elegido,
+                 o (movimiento, SearchStats) con return_stats.
         """
+        deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        stats = None
+        if self.collect_stats:
+            stats = SearchStats()
+            stats.start()
+        if self.profiler is not None:
+            move, phase = self.profiler.profile_move(self.symbol, self.choose_move, board, deadline, stats)
+        else:
+            move, phase = self.choose_move(board, deadline, stats)
+        if stats is not None:
+            stats.finish(phase)
+            self.last_stats = stats
+            self.game_stats.merge(stats)
+        if return_stats:
+            return move, stats
+        return move
+
+    def choose_move(self, board, deadline, stats=None):
+        """
+        Cascada de reglas de get_best_move.
+        :param deadline: Instante (time.perf_counter) en que debe estar elegido el
+                         movimiento (None = sin límite); la búsqueda recibe lo que quede.
+        :param stats: SearchStats en el que anotar el tiempo de cada fase (o None).
+        :return: Tupla (movimiento, nombre de la fase que lo eligió).
+        """
+        lap = stats.lap if stats is not None else _no_lap
+        self.tt.new_search()
         # 0.Agilizar y optimizar primer movimiento, ya que maxmin es subóptimo (la esquina da pena)
         if board.firstmove == "S":
             board.firstmove = "."
             move = self.firstm(board)
+            lap("opening")
             if move:
-                return move
+                return move, "opening"
+        # Un único análisis táctico del tablero para todas las prioridades
+        opponent_symbol = "X" if self.symbol == "O" else "O"
+        report = self.scan_threats(board)
+        lap("scan")
         # 1. Ganar si es posible
-        move = self.find_alignment(board, self.symbol, 4, to_win=True)
+        move = self.pick_move(board, report.wins[self.symbol])
+        lap("win")
         if move:
-            return move
+            return move, "win"
 
         # 2. Bloquear amenazas del oponente
-        opponent_symbol = "X" if self.symbol == "O" else "O"
-        for length in [5, 4]:
-            move = self.find_blocking_move_pro(board, opponent_symbol, length)
-            if move:
-                return move
+        move = self.pick_move(board, report.wins[opponent_symbol])
+        lap("block")
+        if move:
+            return move, "block"
+        # 2.5 Victoria forzada con cuatros (VCF) o treses (VCT), con su propio presupuesto
+        if self.threat_search.node_limit:
+            # Sin pasar de su parte del tiempo que queda, para dejar margen a la búsqueda
+            threat_deadline = None
+            if deadline is not None:
+                threat_deadline = time.perf_counter() + _remaining(deadline) * THREAT_TIME_SHARE
+            line = self.threat_search.solve(board, self.symbol, deadline=threat_deadline)
+            lap("threat_search")
+            if stats is not None:
+                stats.threat_nodes = self.threat_search.nodes
+            if line:
+                return line[0], "threat_search"
         # 3. Capturar dos fichas enemigas
-        move = self.find_capture_move(board)
+        move = self.pick_move(board, report.captures[self.symbol])
+        lap("capture")
         if move:
-            return move
+            return move, "capture"
         #3.5 proteger de ser capturado
-        move = self.protect_capture_move(board)
+        move = self.pick_move(board, report.captures[opponent_symbol])
+        lap("protect")
         if move:
             row, col = move
             if board.ft_mininotcap(row, col, self.symbol):
-                return move
-        for length in [3, 2]:
-            move = self.find_blocking_move_pro(board, opponent_symbol, length)
-            if move:
-                return move
-            
-        # 4 y 5. Bloquear extremos de alineaciones enemigas
-        for length in [3, 2]:
-            move = self.block_alignment_extremes(board, opponent_symbol, length)
+                return move, "protect"
+        # 4 y 5. Bloquear cuatros y treses abiertos enemigos
+        for threats in (report.fours[opponent_symbol], report.open_threes[opponent_symbol]):
+            move = self.pick_move(board, threats)
             if move:
-                return move
-        # 6. Aplicar heurística minimax
-        _, move = self.minimax(board, depth=2, maximizing_player=True)
+                lap("block_threats")
+                return move, "block_threats"
+        lap("block_threats")
+        # 6. Búsqueda alfa-beta con profundización iterativa (o Monte Carlo)
+        # con el tiempo que no han gastado las fases anteriores
+        time_limit = _remaining(deadline)
+        if self.engine == "mcts":
+            move = self.mcts.search(board, self.symbol, time_limit, self.playouts)
+        elif self.workers > 1:
+            move = self.search_parallel(board, time_limit)
+        else:
+            _, move, _ = self.search(board, time_limit)
+        lap("search")
+        if stats is not None:
+            self.record_search_stats(stats)
         if move:
-            return move
+            return move, "search"
         # 7. Colocar cerca de fichas enemigas
         move = self.near_opponent(board, opponent_symbol)
+        lap("near_opponent")
         if move:
-            return move
+            return move, "near_opponent"
         # Movimiento predeterminado
-        return random.choice(board.get_empty_positions())
+        move = random.choice(board.get_empty_positions())
+        lap("random")
+        return move, "random"
+
+    def record_search_stats(self, stats):
+        """Copia en stats los contadores de la última búsqueda."""
+        if self.engine == "mcts":
+            search_stats = self.mcts.stats()
+            stats.nodes = search_stats["nodes"]
+            stats.playouts = search_stats["playouts"]
+            return
+        stats.nodes = self.nodes
+        stats.leaves = self.leaves
+        stats.evaluate_seconds = self.evaluate_seconds
+        stats.depth = self.completed_depth
+        stats.max_ply = self.max_ply
+        stats.expanded = self.expanded
+        stats.children = self.children
+        stats.cutoffs = self.cutoffs
+        stats.first_move_cutoffs = self.first_move_cutoffs
+
+    def _timed_evaluate_board(self, board):
+        """evaluate_board contando hojas y tiempo (solo con estadísticas activadas)."""
+        start = time.perf_counter()
+        score = type(self).evaluate_board(self, board)
+        self.evaluate_seconds += time.perf_counter() - start
+        self.leaves += 1
+        return score
+
+    def pick_move(self, board, cells):
+        """
+        Elige, entre las casillas de un apartado del informe táctico, la más
+        repetida que sea un movimiento válido para la IA.
+        :param cells: Diccionario casilla -> número de patrones (ver ThreatReport).
+        :return: Tupla (fila, columna) o None.
+        """
+        for move in ThreatReport.ranked(cells):
+            if board.is_valid_move(move, self.symbol):
+                return move
+        return None
 
     def firstm(self, board):
         for i in range(board.size):
@@ -90,52 +290,50 @@ class AIPlayer:
         :return: Coordenadas (fila, columna) del mejor movimiento, o None.
         """
         directions = [(1, 0), (0, 1), (1, 1), (1, -1), (-1, 0), (0, -1), (-1, -1), (-1, 1)]
-        for row in range(board.size):
-            for col in range(board.size):
-                if board.grid[row][col] != ".":
-                    continue
-                for dr, dc in directions:
-                    aligned_count = 0
-                    gaps = 0
-                    positions = []  # Para almacenar las posiciones alineadas y huecos
-
-                    for step in range(-length, length + 1):
-                        r, c = row + dr * step, col + dc * step
-                        if 0 <= r < board.size and 0 <= c < board.size:
-                            if board.grid[r][c] == symbol:
-                                aligned_count += 1
-                                positions.append((r, c))
-                            elif board.grid[r][c] == ".":
-                                gaps += 1
-                                positions.append((r, c))
-                            else:
-                                # Otro símbolo bloquea la alineación
-                                break
+        # Solo casillas vacías cerca de alguna ficha (generador incremental del tablero)
+        for row, col in board.candidate_moves():
+            for dr, dc in directions:
+                aligned_count = 0
+                gaps = 0
+                positions = []  # Para almacenar las posiciones alineadas y huecos
+
+                for step in range(-length, length + 1):
+                    r, c = row + dr * step, col + dc * step
+                    if 0 <= r < board.size and 0 <= c < board.size:
+                        if board.grid[r][c] == symbol:
+                            aligned_count += 1
+                            positions.append((r, c))
+                        elif board.grid[r][c] == ".":
+                            gaps += 1
+                            positions.append((r, c))
                         else:
-                            # Fuera del tablero, bloquea la alineación
+                            # Otro símbolo bloquea la alineación
                             break
+                    else:
+                        # Fuera del tablero, bloquea la alineación
+                        break
 
-                    # Verificar condiciones para ganar o bloquear
-                    if (
-                        aligned_count == length
-                        and (gaps == 1 or to_win)  # Considera un hueco si no es para ganar
-                        and (row, col) in positions  # El espacio actual es parte del patrón
-                    ):
-                        return row, col
+                # Verificar condiciones para ganar o bloquear
+                if (
+                    aligned_count == length
+                    and (gaps == 1 or to_win)  # Considera un hueco si no es para ganar
+                    and (row, col) in positions  # El espacio actual es parte del patrón
+                ):
+                    return row, col
 
-                    # Detectar peligros por extremos
+                # Detectar peligros por extremos
+                if (
+                    aligned_count == length - 1
+                    and gaps == 2
+                    and (row, col) in positions  # Asegurarse de que es parte del patrón
+                ):
+                    start_r, start_c = row - dr, col - dc
+                    end_r, end_c = row + dr, col + dc
                     if (
-                        aligned_count == length - 1
-                        and gaps == 2
-                        and (row, col) in positions  # Asegurarse de que es parte del patrón
+                        0 <= start_r < board.size and 0 <= start_c < board.size and board.grid[start_r][start_c] == "."
+                        and 0 <= end_r < board.size and 0 <= end_c < board.size and board.grid[end_r][end_c] == "."
                     ):
-                        start_r, start_c = row - dr, col - dc
-                        end_r, end_c = row + dr, col + dc
-                        if (
-                            0 <= start_r < board.size and 0 <= start_c < board.size and board.grid[start_r][start_c] == "."
-                            and 0 <= end_r < board.size and 0 <= end_c < board.size and board.grid[end_r][end_c] == "."
-                        ):
-                            return row, col
+                        return row, col
 
         return None
 
@@ -153,59 +351,18 @@ class AIPlayer:
         return self.find_alignment(board, opponent_symbol, length, to_win=False)
 
     def find_capture_move(self, board):
-        # Encuentra un movimiento que capture piezas del oponente
-        opponent_symbol = "X" if self.symbol == "O" else "O"
-        directions = [(1, 0), (0, 1), (1, 1), (1, -1), (-1, 0), (0, -1), (-1, -1), (-1, 1)]
-
-        for row in range(board.size):
-            for col in range(board.size):
-                if board.grid[row][col] != ".":
-                    continue
-                for dr, dc in directions:
-                    r1, c1 = row + dr, col + dc
-                    r2, c2 = row + 2 * dr, col + 2 * dc
-                    r3, c3 = row + 3 * dr, col + 3 * dc
-
-                    if (
-                        0 <= r1 < board.size
-                        and 0 <= c1 < board.size
-                        and 0 <= r2 < board.size
-                        and 0 <= c2 < board.size
-                        and 0 <= r3 < board.size
-                        and 0 <= c3 < board.size
-                        and board.grid[r1][c1] == opponent_symbol
-                        and board.grid[r2][c2] == opponent_symbol
-                        and board.grid[r3][c3] == self.symbol
-                    ):
-                        return row, col
+        # Encuentra un movimiento que capture piezas del oponente (índice de capturas)
+        cells = board.capture_moves[self.symbol]
+        if cells:
+            return min(cells)
         return None
     
     def protect_capture_move(self, board):
-        # Encuentra un movimiento que capture piezas del oponente
+        # Encuentra la casilla donde el oponente capturaría piezas propias (índice de capturas)
         opponent_symbol = "X" if self.symbol == "O" else "O"
-        directions = [(1, 0), (0, 1), (1, 1), (1, -1), (-1, 0), (0, -1), (-1, -1), (-1, 1)]
-
-        for row in range(board.size):
-            for col in range(board.size):
-                if board.grid[row][col] != ".":
-                    continue
-                for dr, dc in directions:
-                    r1, c1 = row + dr, col + dc
-                    r2, c2 = row + 2 * dr, col + 2 * dc
-                    r3, c3 = row + 3 * dr, col + 3 * dc
-
-                    if (
-                        0 <= r1 < board.size
-                        and 0 <= c1 < board.size
-                        and 0 <= r2 < board.size
-                        and 0 <= c2 < board.size
-                        and 0 <= r3 < board.size
-                        and 0 <= c3 < board.size
-                        and board.grid[r1][c1] == self.symbol
-                        and board.grid[r2][c2] == self.symbol
-                        and board.grid[r3][c3] == opponent_symbol
-                    ):
-                        return row, col
+        cells = board.capture_moves[opponent_symbol]
+        if cells:
+            return min(cells)
         return None
     
     def block_alignment_extremes(self, board, opponent_symbol, length):
@@ -213,50 +370,293 @@ class AIPlayer:
         Bloquea los extremos de alineaciones enemigas.
         """
         directions = [(1, 0), (0, 1), (1, 1), (1, -1), (-1, 0), (0, -1), (-1, -1), (-1, 1)]
-        for row in range(board.size):
-            for col in range(board.size):
-                if board.grid[row][col] != ".":
-                    continue
-                for dr, dc in directions:
-                    aligned = []
-                    for step in range(length):
-                        r, c = row + dr * step, col + dc * step
-                        if 0 <= r < board.size and 0 <= c < board.size:
-                            if board.grid[r][c] == opponent_symbol:
-                                aligned.append((r, c))
-                    if len(aligned) == length:
-                        return row, col
+        for row, col in board.candidate_moves():
+            for dr, dc in directions:
+                aligned = []
+                for step in range(length):
+                    r, c = row + dr * step, col + dc * step
+                    if 0 <= r < board.size and 0 <= c < board.size:
+                        if board.grid[r][c] == opponent_symbol:
+                            aligned.append((r, c))
+                if len(aligned) == length:
+                    return row, col
         return None
 
-    def minimax(self, board, depth, maximizing_player):
+    def search_parallel(self, board, time_limit=None):
+        """
+        Reparte los movimientos de la raíz entre varios procesos (ver parallel.py).
+        :return: Mejor movimiento encontrado, o None.
+        """
+        if self.parallel is None:
+            from parallel import ParallelSearch
+            self.parallel = ParallelSearch(
+                self.workers, evaluator=self.evaluator, max_depth=self.max_depth,
+                tt_entries=self.tt.capacity, stats=self.collect_stats,
+            )
+        self.reset_counters()
+        hash_entry = self.tt.probe(board.search_key)
+        hash_move = hash_entry[4] if hash_entry is not None else None
+        root_moves = self.order_moves(board, board.candidate_moves(), hash_move, self.symbol, 0)
+        score, move, depth, _ = self.parallel.search(board, self.symbol, time_limit, root_moves)
+        # Los contadores de la búsqueda son la suma de los de cada proceso
+        for counters in self.parallel.worker_counters:
+            self.add_counters(counters)
+        self.completed_depth = depth
+        if move is not None:
+            self.tt.store(board.search_key, score, depth, EXACT, move)
+        return move
+
+    def reset_counters(self):
+        """Pone a cero los contadores de la búsqueda (ver record_search_stats)."""
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.completed_depth = 0
+        self.max_ply = 0
+        self.expanded = 0
+        self.children = 0
+        self.leaves = 0
+        self.evaluate_seconds = 0.0
+
+    def counters(self):
+        """
+        Contadores de la última búsqueda, para sumarlos desde otro proceso.
+        :return: Diccionario serializable.
+        """
+        return {
+            "nodes": self.nodes,
+            "leaves": self.leaves,
+            "evaluate_seconds": self.evaluate_seconds,
+            "max_ply": self.max_ply,
+            "expanded": self.expanded,
+            "children": self.children,
+            "cutoffs": self.cutoffs,
+            "first_move_cutoffs": self.first_move_cutoffs,
+        }
+
+    def add_counters(self, counters):
+        """Suma los contadores de otra búsqueda (max_ply se queda con el máximo)."""
+        self.nodes += counters["nodes"]
+        self.leaves += counters["leaves"]
+        self.evaluate_seconds += counters["evaluate_seconds"]
+        self.max_ply = max(self.max_ply, counters["max_ply"])
+        self.expanded += counters["expanded"]
+        self.children += counters["children"]
+        self.cutoffs += counters["cutoffs"]
+        self.first_move_cutoffs += counters["first_move_cutoffs"]
+
+    def close(self):
+        """Libera los procesos de la búsqueda paralela, si se crearon."""
+        if self.parallel is not None:
+            self.parallel.close()
+            self.parallel = None
+
+    def search(self, board, time_limit=None, root_moves=None):
+        """
+        Profundización iterativa sobre negamax alfa-beta con límite de tiempo.
+        :param board: Instancia del tablero (clase Board).
+        :param time_limit: Segundos disponibles (None = hasta max_depth).
+        :param root_moves: Movimientos de la raíz a considerar (por defecto, todos los candidatos).
+        :return: Tupla (puntuación, movimiento, profundidad) de la última iteración completa.
+        """
+        start = time.perf_counter()  # El plazo cuenta desde la llamada
+        self.reset_counters()
+        self.iterations = []
+        self.deadline = None
+        self.killers = [[None, None] for _ in range(self.max_depth + 1)]
+        # La historia se conserva entre turnos, pero va perdiendo peso
+        for move in self.history:
+            self.history[move] //= 2
+        best_score, best_move, completed = None, None, 0
+        root_depth = len(board.move_stack)
+        for depth in range(1, self.max_depth + 1):
+            # La primera iteración siempre se completa para tener un movimiento
+            if depth > 1 and time_limit is not None:
+                self.deadline = start + time_limit
+            try:
+                score, move = self.search_root(board, depth, best_move, root_moves)
+            except SearchTimeout:
+                while len(board.move_stack) > root_depth:
+                    board.pop()
+                break
+            if move is None:
+                break
+            best_score, best_move, completed = score, move, depth
+            self.completed_depth = depth
+            self.iterations.append((depth, score, move, self.nodes))
+            if abs(score) >= WIN_SCORE - MAX_DEPTH:
+                break  # Victoria o derrota forzada: no hace falta profundizar más
+            if time_limit is not None and time.perf_counter() - start >= time_limit:
+                break
+        return best_score, best_move, completed
+
+    def search_root(self, board, depth, pv_move, root_moves=None):
+        """
+        Busca todos los movimientos de la raíz a la profundidad dada.
+        :param pv_move: Mejor movimiento de la iteración anterior (se prueba primero).
+        :param root_moves: Subconjunto de movimientos de la raíz (None = todos los candidatos).
+        :return: Tupla (puntuación, movimiento).
+        """
+        if root_moves is None:
+            root_moves = board.candidate_moves()
+        opponent_symbol = "X" if self.symbol == "O" else "O"
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        best_score, best_move = -WIN_SCORE - 1, None
+        searched = 0
+        for move in self.order_moves(board, root_moves, pv_move, self.symbol, 0):
+            if not board.push(move, self.symbol):
+                continue
+            board.check_winner(self.symbol)
+            score = -self.negamax(board, depth - 1, -beta, -alpha, opponent_symbol, 1)
+            board.pop()
+            searched += 1
+            if score > best_score:
+                best_score, best_move = score, move
+            if score > alpha:
+                alpha = score
+        if searched:
+            self.expanded += 1
+            self.children += searched
+        if best_move is not None:
+            self.tt.store(board.search_key, best_score, depth, EXACT, best_move)
+        return best_score, best_move
+
+    def negamax(self, board, depth, alpha, beta, symbol, ply):
         """
-        Algoritmo minimax para evaluar movimientos.
+        Negamax con poda alfa-beta y tabla de transposiciones.
+        :param symbol: Jugador al que le toca mover en este nodo.
+        :param ply: Distancia a la raíz (para preferir victorias más cortas).
+        :return: Puntuación desde el punto de vista de symbol.
         """
-        if depth == 0 or board.is_game_over():
-            return self.evaluate_board(board), None
+        self.nodes += 1
+        if ply > self.max_ply:
+            self.max_ply = ply
+        if self.deadline is not None and self.nodes % TIME_CHECK_NODES == 0:
+            if time.perf_counter() >= self.deadline:
+                raise SearchTimeout()
+
+        winner = board.winner()
+        if winner is not None:
+            return WIN_SCORE - ply if winner == symbol else ply - WIN_SCORE
+        if depth == 0 or board.is_draw():
+            score = self.evaluate_board(board)
+            return score if symbol == self.symbol else -score
+
+        alpha_orig = alpha
+        key = board.search_key
+        hash_move = None
+        entry = self.tt.probe(key)
+        if entry is not None:
+            hash_move = entry[4]
+            if entry[2] >= depth:
+                score = from_tt_score(entry[1], ply)
+                if entry[3] == EXACT:
+                    return score
+                if entry[3] == LOWER:
+                    alpha = max(alpha, score)
+                elif entry[3] == UPPER:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score
+
+        opponent_symbol = "X" if symbol == "O" else "O"
+        best_score, best_move = -WIN_SCORE - 1, None
+        searched = 0
+        for move in self.order_moves(board, board.candidate_moves(), hash_move, symbol, ply):
+            # Movimiento real (con capturas) que pop() deshace por completo
+            if not board.push(move, symbol):
+                continue
+            board.check_winner(symbol)  # Igual que el bucle de juego tras cada movimiento
+            score = -self.negamax(board, depth - 1, -beta, -alpha, opponent_symbol, ply + 1)
+            board.pop()
+            searched += 1
+            if score > best_score:
+                best_score, best_move = score, move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                self.record_cutoff(board, move, depth, ply, searched == 1)
+                break
 
-        best_move = None
-        if maximizing_player:
-            max_eval = float('-inf')
-            for move in board.get_empty_positions():
-                board.make_move_nocap(move, self.symbol)
-                eval_score, _ = self.minimax(board, depth - 1, False)
-                board.undo_move(move)
-                if eval_score > max_eval:
-                    max_eval = eval_score
-                    best_move = move
-            return max_eval, best_move
+        if searched:
+            self.expanded += 1
+            self.children += searched
+        if best_move is None:
+            return 0  # Sin movimientos legales
+        if best_score <= alpha_orig:
+            bound = UPPER
+        elif best_score >= beta:
+            bound = LOWER
         else:
-            opponent_symbol = "X" if self.symbol == "O" else "O"
-            min_eval = float('inf')
-            for move in board.get_empty_positions():
-                board.make_move_nocap(move, opponent_symbol)
-                eval_score, _ = self.minimax(board, depth - 1, True)
-                board.undo_move(move)
-                if eval_score < min_eval:
-                    min_eval = eval_score
-                    best_move = move
-            return min_eval, best_move
+            bound = EXACT
+        self.tt.store(key, to_tt_score(best_score, ply), depth, bound, best_move)
+        return best_score
+
+    def order_moves(self, board, moves, hash_move, symbol, ply):
+        """
+        Ordena los movimientos: el de la tabla de transposiciones, victorias,
+        bloqueos de cuatro, capturas, asesinos del ply y después por historia.
+        :param hash_move: Movimiento de la tabla o de la iteración anterior.
+        :param symbol: Jugador que mueve.
+        :param ply: Distancia a la raíz.
+        :return: Lista de movimientos.
+        """
+        opponent_symbol = "X" if symbol == "O" else "O"
+        killers = self.killers[ply] if ply < len(self.killers) else (None, None)
+        history = self.history
+        wins = board.five_cells(symbol)
+        blocks = board.five_cells(opponent_symbol)
+        scored = []
+        for move in moves:
+            row, col = move
+            if move == hash_move:
+                priority = ORDER_HASH
+            elif move in wins:
+                priority = ORDER_WIN
+            elif move in blocks:
+                priority = ORDER_BLOCK_FOUR
+            else:
+                pairs = board.capture_count(row, col, symbol)
+                if pairs:
+                    priority = ORDER_CAPTURE + pairs
+                elif move == killers[0]:
+                    priority = ORDER_KILLER + 1
+                elif move == killers[1]:
+                    priority = ORDER_KILLER
+                else:
+                    priority = history.get(move, 0)
+            scored.append((priority, move))
+        scored.sort(key=lambda item: -item[0])  # Estable: empata en orden de fila y columna
+        return [move for _, move in scored]
+
+    def record_cutoff(self, board, move, depth, ply, first):
+        """
+        Actualiza asesinos, historia y estadísticas tras un corte beta.
+        :param first: True si cortó el primer movimiento probado.
+        """
+        self.cutoffs += 1
+        if first:
+            self.first_move_cutoffs += 1
+        row, col = move
+        if board.capture_count(row, col, board.turn):
+            return  # Las capturas ya tienen su propia prioridad
+        if ply < len(self.killers):
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+        self.history[move] = self.history.get(move, 0) + depth * depth
+
+    def ordering_stats(self):
+        """
+        Calidad de la ordenación en la última búsqueda.
+        :return: Diccionario con cortes, cortes en el primer movimiento y su proporción.
+        """
+        return {
+            "cutoffs": self.cutoffs,
+            "first_move_cutoffs": self.first_move_cutoffs,
+            "first_move_cutoff_rate": self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0,
+        }
 
     def near_opponent(self, board, opponent_symbol):
         """
@@ -274,7 +674,26 @@ class AIPlayer:
 
     def evaluate_board(self, board):
         """
-        Evalúa el tablero para determinar la ventaja.
+        Evalúa el tablero para determinar la ventaja, con el evaluador elegido.
+        """
+        if self.evaluator == "material":
+            return self.evaluate_material(board)
+        return self.evaluate_patterns(board)
+
+    def evaluate_patterns(self, board):
+        """
+        Evalúa patrones (doses, treses y cuatros abiertos o cerrados, amenazas de
+        captura) con las puntuaciones por línea que el tablero mantiene, más el
+        valor de las capturas acumuladas. Solo cuesta recalcular las líneas tocadas.
+        """
+        opponent_symbol = "X" if self.symbol == "O" else "O"
+        score = board.pattern_score(self.symbol) - board.pattern_score(opponent_symbol)
+        score += capture_value(board.captures[self.symbol]) - capture_value(board.captures[opponent_symbol])
+        return score
+
+    def evaluate_material(self, board):
+        """
+        Evalúa el tablero contando fichas (evaluador original, para comparar).
         """
         score = 0
         opponent_symbol = "X" if self.symbol == "O" else "O"
@@ -285,3 +704,21 @@ class AIPlayer:
                 elif board.grid[row][col] == opponent_symbol:
                     score -= 10
         return score
+
+
+def to_tt_score(score, ply):
+    """Convierte una victoria relativa a la raíz en relativa al nodo, para guardarla."""
+    if score >= WIN_SCORE - MAX_DEPTH * 2:
+        return score + ply
+    if score <= MAX_DEPTH * 2 - WIN_SCORE:
+        return score - ply
+    return score
+
+
+def from_tt_score(score, ply):
+    """Operación inversa a to_tt_score al leer de la tabla."""
+    if score >= WIN_SCORE - MAX_DEPTH * 2:
+        return score - ply
+    if score <= MAX_DEPTH * 2 - WIN_SCORE:
+        return score + ply
+    return score
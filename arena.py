@@ -0,0 +1,312 @@
+# arena.py
+
+import argparse
+import ast
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+
+from ai import AIPlayer
+from board import Board
+from profiling import DEFAULT_DIRECTORY, ENV_DIRECTORY, ENV_MODE, MODES, Profiler
+
+Z_95 = 1.959964  # Cuantil de la normal para intervalos del 95 %
+
+
+def parse_config(text):
+    """
+    Convierte "clave=valor,clave=valor" en argumentos de AIPlayer.
+    Los valores se leen como literales de Python (números, None, True...) y,
+    si no lo son, se dejan como texto.
+    :return: Diccionario de argumentos.
+    """
+    config = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        key, _, value = item.partition("=")
+        try:
+            config[key.strip()] = ast.literal_eval(value.strip())
+        except (ValueError, SyntaxError):
+            config[key.strip()] = value.strip()
+    return config
+
+
+def random_opening(rng, plies, size=19):
+    """
+    Apertura aleatoria de plies movimientos alternos en el centro del tablero.
+    :return: Lista de tuplas (fila, columna).
+    """
+    center = size // 2
+    cells = [(row, col) for row in range(center - 2, center + 3) for col in range(center - 2, center + 3)]
+    return rng.sample(cells, plies)
+
+
+def play_game(task):
+    """
+    Juega una partida entre dos configuraciones con las reglas del bucle de
+    mainsimple.py: tras cada movimiento válido se llama a check_winner, y al
+    salir del bucle deciden las capturas, el empate y la bandera acabose.
+    :param task: Tupla (número de partida, configuración A, configuración B,
+                 True si A juega con 'X', apertura, segundos por movimiento,
+                 movimientos máximos, semilla, perfilado). El perfilado es None
+                 o (modo, carpeta) de profiling.Profiler; los archivos llevan
+                 el prefijo "game-NNNN-".
+    :return: Diccionario con el ganador ('A', 'B' o None), el motivo, los
+             movimientos, la duración y las latencias por movimiento de A y B.
+    """
+    game, config_a, config_b, a_is_x, opening, time_limit, max_moves, seed, profile = task
+    random.seed(seed)  # La IA usa random en la apertura y como último recurso
+    board = Board(19)
+    symbol = "X"
+    for move in opening:
+        board.make_move(move, symbol)
+        symbol = "O" if symbol == "X" else "X"
+    if opening:
+        board.firstmove = "."
+    symbol_a = "X" if a_is_x else "O"
+    symbol_b = "O" if a_is_x else "X"
+    profiler = None
+    if profile is not None:
+        profiler = Profiler(profile[0], profile[1], prefix=f"game-{game:04d}-")
+    players = {
+        symbol_a: ("A", AIPlayer("A", symbol_a, profiler=profiler, **config_a)),
+        symbol_b: ("B", AIPlayer("B", symbol_b, profiler=profiler, **config_b)),
+    }
+    if profiler is not None:
+        profiler.start_game()
+    latencies = {"A": [], "B": []}
+    winner = None
+    reason = None
+    moves = 0
+    start = time.perf_counter()
+    try:
+        while not board.is_game_over():
+            if moves >= max_moves:
+                reason = "límite de movimientos"
+                break
+            role, player = players[symbol]
+            move_start = time.perf_counter()
+            move = player.get_best_move(board, time_limit)
+            latencies[role].append(time.perf_counter() - move_start)
+            # Sin nadie que corrija la jugada, un movimiento inválido pierde la partida
+            if move is None or not board.make_move(move, symbol):
+                winner = "B" if role == "A" else "A"
+                reason = "movimiento inválido"
+                break
+            moves += 1
+            if board.check_winner(symbol):
+                winner = role
+                reason = "alineación"
+                break
+            symbol = "O" if symbol == "X" else "X"
+    finally:
+        # Libera los procesos de las IA con workers > 1
+        for _, player in players.values():
+            player.close()
+    if reason is None:
+        if board.captures["X"] >= 10:
+            winner, reason = players["X"][0], "capturas"
+        elif board.captures["O"] >= 10:
+            winner, reason = players["O"][0], "capturas"
+        elif board.is_draw():
+            reason = "empate"
+        elif board.acabose != ".":
+            winner, reason = players[board.acabose][0], "alineación"
+        else:
+            reason = "empate"
+    if profiler is not None:
+        profiler.end_game()
+    return {
+        "game": game,
+        "a_is_x": a_is_x,
+        "winner": winner,
+        "reason": reason,
+        "moves": moves,
+        "seconds": time.perf_counter() - start,
+        "latencies": latencies,
+    }
+
+
+def elo(wins, draws, losses):
+    """
+    Diferencia de Elo de A sobre B a partir de la puntuación media, con su
+    intervalo del 95 % (aproximación normal de la puntuación por partida).
+    :return: Tupla (Elo, límite inferior, límite superior); infinitos si A
+             o B no han perdido ningún punto.
+    """
+    games = wins + draws + losses
+    if not games:
+        return 0.0, -math.inf, math.inf
+    score = (wins + 0.5 * draws) / games
+    variance = (
+        wins * (1.0 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2
+    ) / games
+    margin = Z_95 * math.sqrt(variance / games)
+    return _elo_from_score(score), _elo_from_score(score - margin), _elo_from_score(score + margin)
+
+
+def _elo_from_score(score):
+    """Diferencia de Elo que corresponde a una puntuación media entre 0 y 1."""
+    if score <= 0.0:
+        return -math.inf
+    if score >= 1.0:
+        return math.inf
+    return 400.0 * math.log10(score / (1.0 - score))
+
+
+def percentiles(values, points=(50, 90, 99)):
+    """
+    Percentiles por rango más cercano.
+    :return: Diccionario "pNN" -> valor (más "max"), vacío si no hay valores.
+    """
+    if not values:
+        return {}
+    ordered = sorted(values)
+    result = {}
+    for point in points:
+        rank = max(1, math.ceil(point / 100.0 * len(ordered)))
+        result[f"p{point}"] = ordered[rank - 1]
+    result["max"] = ordered[-1]
+    return result
+
+
+def run_tournament(config_a, config_b, games, workers=1, time_limit=0.5, max_moves=361,
+                   opening_plies=2, seed=0, profile=None):
+    """
+    Enfrenta dos configuraciones de AIPlayer en partidas por parejas: cada
+    apertura aleatoria se juega dos veces, cambiando los colores.
+    :param config_a: Argumentos de AIPlayer del jugador A.
+    :param config_b: Argumentos de AIPlayer del jugador B.
+    :param games: Número de partidas.
+    :param workers: Procesos (1 = en este proceso). Con más de uno, las
+                    configuraciones no pueden usar workers > 1: los procesos
+                    del torneo no pueden crear los suyos.
+    :param time_limit: Segundos por movimiento para get_best_move.
+    :param max_moves: Movimientos tras los que la partida se da por empatada.
+    :param opening_plies: Movimientos aleatorios de la apertura (0 = tablero vacío).
+    :param seed: Semilla de las aperturas y de cada partida.
+    :param profile: None o (modo, carpeta) para perfilar cada partida (ver play_game).
+    :return: Diccionario con el resumen (ver summarize) y las partidas.
+    """
+    if workers > 1 and any(config.get("workers", 1) > 1 for config in (config_a, config_b)):
+        raise ValueError("Con varios procesos de torneo, las IA deben usar workers=1")
+    rng = random.Random(seed)
+    openings = [random_opening(rng, opening_plies) for _ in range((games + 1) // 2)]
+    tasks = [
+        (game, config_a, config_b, game % 2 == 0, openings[game // 2], time_limit, max_moves, seed + game,
+         profile)
+        for game in range(games)
+    ]
+    start = time.perf_counter()
+    if workers == 1:
+        results = [play_game(task) for task in tasks]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.map(play_game, tasks, chunksize=1)
+    elapsed = time.perf_counter() - start
+    return {"summary": summarize(results, elapsed), "games": results}
+
+
+def summarize(results, elapsed):
+    """
+    Resume las partidas desde el punto de vista de A.
+    :param results: Lista de diccionarios de play_game.
+    :param elapsed: Segundos totales del torneo.
+    :return: Diccionario con victorias, tablas y derrotas, Elo e intervalo,
+             partidas por segundo, motivos de final y latencias de A y B.
+    """
+    wins = sum(1 for result in results if result["winner"] == "A")
+    losses = sum(1 for result in results if result["winner"] == "B")
+    draws = len(results) - wins - losses
+    rating, low, high = elo(wins, draws, losses)
+    reasons = {}
+    for result in results:
+        reasons[result["reason"]] = reasons.get(result["reason"], 0) + 1
+    return {
+        "games": len(results),
+        "wins": wins,
+        "draws": draws,
+        "losses": losses,
+        "elo": rating,
+        "elo_low": low,
+        "elo_high": high,
+        "seconds": elapsed,
+        "games_per_second": len(results) / elapsed if elapsed else 0.0,
+        "moves": sum(result["moves"] for result in results),
+        "reasons": reasons,
+        "latency": {
+            role: percentiles([value for result in results for value in result["latencies"][role]])
+            for role in ("A", "B")
+        },
+    }
+
+
+def _json_safe(value):
+    """
+    Copia de un resultado apta para JSON estándar: los números no finitos
+    (el Elo cuando un jugador no pierde ningún punto) pasan a None.
+    """
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_json_safe(item) for item in value]
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Torneo sin interfaz entre dos configuraciones de AIPlayer")
+    parser.add_argument("--a", default="", help='Configuración de A, p. ej. "engine=mcts,playouts=300"')
+    parser.add_argument("--b", default="", help='Configuración de B, p. ej. "max_depth=2"')
+    parser.add_argument("--games", type=int, default=20, help="Número de partidas")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos (por defecto, todos los núcleos)")
+    parser.add_argument("--time", type=float, default=0.5, help="Segundos por movimiento")
+    parser.add_argument("--max-moves", type=int, default=361, help="Movimientos antes de dar tablas")
+    parser.add_argument("--opening", type=int, default=2, help="Movimientos aleatorios de apertura")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de aperturas y partidas")
+    parser.add_argument("--json", action="store_true", help="Imprime el resultado completo en JSON")
+    parser.add_argument("--profile", choices=MODES, default=os.environ.get(ENV_MODE) or None,
+                        help="Perfila cada partida: cProfile por movimiento (moves) o muestreo de pilas (sample)")
+    parser.add_argument("--profile-dir", default=os.environ.get(ENV_DIRECTORY, DEFAULT_DIRECTORY),
+                        help="Carpeta de los perfiles")
+    args = parser.parse_args()
+    workers = args.workers or multiprocessing.cpu_count()
+    profile = (args.profile, args.profile_dir) if args.profile else None
+    try:
+        result = run_tournament(
+            parse_config(args.a), parse_config(args.b), args.games, workers=workers, time_limit=args.time,
+            max_moves=args.max_moves, opening_plies=args.opening, seed=args.seed, profile=profile,
+        )
+    except ValueError as error:
+        parser.error(str(error))
+    summary = result["summary"]
+    if args.json:
+        print(json.dumps(_json_safe(result), indent=2, ensure_ascii=False, allow_nan=False))
+        return
+    print(f"A: {args.a or 'por defecto'}")
+    print(f"B: {args.b or 'por defecto'}")
+    print(
+        f"A gana {summary['wins']}, tablas {summary['draws']}, pierde {summary['losses']} "
+        f"de {summary['games']} partidas"
+    )
+    print(f"Elo de A sobre B: {summary['elo']:+.0f} (95 %: {summary['elo_low']:+.0f} a {summary['elo_high']:+.0f})")
+    print(
+        f"{summary['games_per_second']:.3f} partidas/s, {summary['moves']} movimientos "
+        f"en {summary['seconds']:.1f} s con {workers} procesos"
+    )
+    print("Finales: " + ", ".join(f"{reason} {count}" for reason, count in sorted(summary["reasons"].items())))
+    for role in ("A", "B"):
+        latency = summary["latency"][role]
+        if latency:
+            print(f"Latencia de {role} (ms): " + " ".join(
+                f"{point} {value * 1000:.1f}" for point, value in latency.items()
+            ))
+    if profile:
+        print(f"Perfiles en {args.profile_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+# batch.py
+
+import argparse
+import time
+
+import numpy as np
+
+EMPTY = 0
+X = 1
+O = 2
+BORDER = 3  # Casilla fuera del tablero
+DRAW = 3  # Valor de winner para una partida en tablas
+PAD = 5  # Margen alrededor del tablero: ninguna comprobación mira más de 5 casillas
+DIRECTIONS = [(1, 0), (0, 1), (1, 1), (1, -1)]  # Vertical, horizontal, diagonales
+CAPTURE_DIRECTIONS = DIRECTIONS + [(-dr, -dc) for dr, dc in DIRECTIONS]
+
+
+class BatchBoard:
+    def __init__(self, games, size=19, seed=None):
+        """
+        N partidas de Gomoku a la vez sobre arrays de NumPy, con las reglas de
+        board.Board: capturas de pares, victoria por 10 capturas, cinco en raya
+        que el rival puede romper capturando y prohibición del doble tres.
+        Internamente las partidas van en el último eje, de modo que desplazar
+        el tablero es un corte contiguo y las máscaras se empaquetan de 8 en 8
+        partidas por byte; cells es la vista (N, size, size) de int8.
+        :param games: Número de partidas (N).
+        :param size: Lado del tablero.
+        :param seed: Semilla de las jugadas aleatorias (None = aleatoria).
+        """
+        self.games = games
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.padded = np.full((size + 2 * PAD, size + 2 * PAD, games), BORDER, dtype=np.int8)
+        self.padded[PAD:PAD + size, PAD:PAD + size] = EMPTY
+        self.cells = self.padded[PAD:PAD + size, PAD:PAD + size].transpose(2, 0, 1)
+        self.captures = np.zeros((games, 3), dtype=np.int16)  # Columnas X y O (la 0 no se usa)
+        self.turn = np.full(games, X, dtype=np.int8)
+        self.pending = np.zeros((games, 3), dtype=bool)  # Cinco hecho, pendiente de la respuesta rival
+        self.winner = np.zeros(games, dtype=np.int8)  # 0 = en juego, X, O o DRAW
+        self.moves = np.zeros(games, dtype=np.int32)
+        self.rows = np.arange(games)
+
+    def _shifted(self, array, dr, dc, steps):
+        """Vista (size, size, ...) de un array con margen desplazada steps casillas en (dr, dc)."""
+        row = PAD + dr * steps
+        col = PAD + dc * steps
+        return array[row:row + self.size, col:col + self.size]
+
+    def active(self):
+        """Máscara (N,) de las partidas que siguen en juego."""
+        return self.winner == 0
+
+    def _forbidden_bits(self, own, empty):
+        """
+        Doble tres sobre máscaras empaquetadas con margen (ver forbidden).
+        :return: Bits (size, size, M/8) de las casillas prohibidas.
+        """
+        ones = np.zeros_like(self._shifted(own, 0, 0, 0))
+        twos = np.zeros_like(ones)
+        for dr, dc in DIRECTIONS:
+            def at(array, steps):
+                return self._shifted(array, dr, dc, steps)
+            # Dos propias delante, dos detrás o una a cada lado, con ambos extremos vacíos
+            three = at(empty, -1) & at(own, 1) & at(own, 2) & at(empty, 3)
+            three |= at(empty, 1) & at(own, -1) & at(own, -2) & at(empty, -3)
+            three |= at(empty, -2) & at(own, -1) & at(own, 1) & at(empty, 2)
+            twos |= ones & three
+            ones |= three
+        return twos & self._shifted(empty, 0, 0, 0)
+
+    def _near_bits(self, occupied, radius):
+        """Dilatación separable (filas y después columnas) de las fichas empaquetadas."""
+        rows = np.zeros_like(occupied)
+        for dr in range(-radius, radius + 1):
+            rows[PAD:PAD + self.size] |= occupied[PAD + dr:PAD + dr + self.size]
+        near = np.zeros_like(self._shifted(occupied, 0, 0, 0))
+        for dc in range(-radius, radius + 1):
+            near |= rows[PAD:PAD + self.size, PAD + dc:PAD + dc + self.size]
+        return near
+
+    def _unpack(self, bits, count):
+        """Desempaqueta bits (size, size, M/8) a una máscara (M, size, size)."""
+        return np.unpackbits(bits, axis=-1, count=count).astype(bool).transpose(2, 0, 1)
+
+    def forbidden(self):
+        """
+        Casillas vacías que darían un doble tres al jugador que mueve, con el
+        mismo recuento que Board.introduces_double_threes: en una dirección hay
+        tres si la casilla y dos fichas propias seguidas (repartidas a ambos
+        lados) acaban en casillas vacías por los dos extremos.
+        :return: Máscara booleana (N, size, size).
+        """
+        own = np.packbits(self.padded == self.turn, axis=-1)
+        empty = np.packbits(self.padded == EMPTY, axis=-1)
+        return self._unpack(self._forbidden_bits(own, empty), self.games)
+
+    def near_stones(self, radius=2):
+        """
+        Casillas a distancia (Chebyshev) <= radius de alguna ficha, como los
+        candidatos de Board. En un tablero vacío, solo el centro.
+        :return: Máscara booleana (N, size, size).
+        """
+        occupied = np.packbits((self.padded == X) | (self.padded == O), axis=-1)
+        near = self._unpack(self._near_bits(occupied, radius), self.games)
+        near[~near.any(axis=(1, 2)), self.size // 2, self.size // 2] = True
+        return near
+
+    def legal_moves(self, near=True):
+        """
+        Movimientos válidos del jugador que mueve en cada partida en juego.
+        :param near: Si es True, solo casillas cercanas a las fichas (radio 2).
+        :return: Máscara booleana (N, size, size).
+        """
+        padded = self.padded
+        own = np.packbits(padded == self.turn, axis=-1)
+        empty = np.packbits(padded == EMPTY, axis=-1)
+        bits = self._shifted(empty, 0, 0, 0) & ~self._forbidden_bits(own, empty)
+        if near:
+            occupied = np.packbits((padded == X) | (padded == O), axis=-1)
+            near_bits = self._near_bits(occupied, 2)
+            # Tablero vacío: solo el centro
+            seen = np.unpackbits(np.bitwise_or.reduce(near_bits, axis=(0, 1)), count=self.games)
+            near_bits[self.size // 2, self.size // 2] |= np.packbits(seen == 0)
+            bits &= near_bits
+        bits &= np.packbits(self.active())  # Las partidas terminadas no tienen movimientos
+        return self._unpack(bits, self.games)
+
+    def has_five(self, players):
+        """
+        Indica qué partidas tienen un cinco en raya del jugador dado.
+        :param players: Jugador de cada partida, array (N,).
+        :return: Máscara booleana (N,).
+        """
+        own = np.packbits(self.padded == players, axis=-1)
+        found = np.zeros(own.shape[-1], dtype=np.uint8)
+        for dr, dc in DIRECTIONS:
+            five = self._shifted(own, 0, 0, 0).copy()
+            for step in range(1, 5):
+                five &= self._shifted(own, dr, dc, step)
+            found |= np.bitwise_or.reduce(five, axis=(0, 1))
+        return np.unpackbits(found, count=self.games).astype(bool)
+
+    def _five_through(self, games, rows, cols, players):
+        """
+        Cinco en raya que pase por la casilla recién jugada de cada partida.
+        :param rows: Filas con margen de las casillas; cols, columnas con margen.
+        :return: Máscara booleana (len(games),).
+        """
+        found = np.zeros(len(games), dtype=bool)
+        for dr, dc in DIRECTIONS:
+            count = np.ones(len(games), dtype=np.int8)
+            for sign in (1, -1):
+                alive = np.ones(len(games), dtype=bool)
+                for step in range(1, 5):
+                    alive &= self.padded[rows + sign * dr * step, cols + sign * dc * step, games] == players
+                    count += alive
+            found |= count >= 5
+        return found
+
+    def step(self, moves):
+        """
+        Juega un movimiento en cada partida en juego: coloca la ficha, ejecuta
+        las capturas y resuelve el final como Board (check_and_execute_capture
+        y check_winner): un cinco gana si la respuesta del rival no lo rompe
+        capturando, y 10 capturas ganan siempre (como en Board.winner).
+        :param moves: Índices fila * size + columna, array (N,); en las partidas
+                      terminadas se ignoran. Deben ser movimientos legales.
+        """
+        games = self.rows[self.active()]
+        if not len(games):
+            return
+        players = self.turn[games]
+        opponents = (3 - players).astype(np.int8)
+        rows, cols = np.divmod(moves[games], self.size)
+        rows = rows + PAD
+        cols = cols + PAD
+        padded = self.padded
+        padded[rows, cols, games] = players
+        # Capturas: par rival seguido de ficha propia en cada una de las 8 direcciones
+        captured = np.zeros(len(games), dtype=bool)
+        for dr, dc in CAPTURE_DIRECTIONS:
+            hit = (
+                (padded[rows + dr, cols + dc, games] == opponents)
+                & (padded[rows + 2 * dr, cols + 2 * dc, games] == opponents)
+                & (padded[rows + 3 * dr, cols + 3 * dc, games] == players)
+            )
+            if hit.any():
+                padded[rows[hit] + dr, cols[hit] + dc, games[hit]] = EMPTY
+                padded[rows[hit] + 2 * dr, cols[hit] + 2 * dc, games[hit]] = EMPTY
+                self.captures[games[hit], players[hit]] += 2
+                captured |= hit
+        self.moves[games] += 1
+        # Cinco pendiente del rival: gana si no se capturó, o si sigue en pie tras capturar
+        pending = self.pending[games, opponents]
+        opponent_five = np.zeros(len(games), dtype=bool)
+        if (pending & captured).any():
+            opponent_five = self.has_five(self._fill(games, opponents))[games]
+        opponent_wins = pending & (~captured | opponent_five)
+        broken = pending & captured & ~opponent_five
+        self.pending[games[broken], opponents[broken]] = False
+        # Un cinco nuevo solo puede pasar por la casilla jugada
+        own_five = self._five_through(games, rows, cols, players)
+        self.pending[games[own_five], players[own_five]] = True
+        winners = np.zeros(len(games), dtype=np.int8)
+        winners[opponent_wins] = opponents[opponent_wins]
+        # Las capturas se comprueban antes que el cinco, como en Board.winner
+        capture_win = self.captures[games, players] >= 10
+        winners[capture_win] = players[capture_win]
+        # Tablero lleno: fichas jugadas menos capturadas
+        stones = self.moves[games] - self.captures[games, X] - self.captures[games, O]
+        winners[(winners == 0) & (stones >= self.size * self.size)] = DRAW
+        self.winner[games] = winners
+        self.turn[games] = opponents
+
+    def _fill(self, games, values):
+        """Array (N,) con values en las partidas games (y 0, ninguna ficha, en el resto)."""
+        full = np.zeros(self.games, dtype=np.int8)
+        full[games] = values
+        return full
+
+    def random_moves(self, legal):
+        """
+        Política aleatoria uniforme entre los movimientos legales.
+        :param legal: Máscara (N, size, size) de legal_moves.
+        :return: Índices (N,), o -1 en las partidas sin movimientos.
+        """
+        flat = legal.reshape(self.games, -1)
+        scores = self.rng.integers(1, 1 << 15, flat.shape, dtype=np.int16)
+        scores *= flat  # Las casillas no legales puntúan 0
+        moves = scores.argmax(axis=1)
+        moves[~flat.any(axis=1)] = -1
+        return moves
+
+    def play(self, policy=None, near=True, max_moves=None):
+        """
+        Juega todas las partidas hasta el final.
+        :param policy: Función (batch, legal) -> índices (N,), con -1 si no hay
+                       movimiento (None = aleatoria entre los legales).
+        :param near: Si es True, los movimientos legales se limitan a la cercanía de las fichas.
+        :param max_moves: Movimientos máximos por partida (None = sin límite).
+        :return: Array winner (N,) con X, O o DRAW.
+        """
+        policy = policy or BatchBoard.random_moves
+        while self.active().any():
+            legal = self.legal_moves(near)
+            moves = policy(self, legal)
+            stuck = self.active() & (moves < 0)
+            if max_moves is not None:
+                stuck |= self.active() & (self.moves >= max_moves)
+            self.winner[stuck] = DRAW  # Sin movimientos válidos o sin más jugadas: tablas
+            self.step(np.maximum(moves, 0))
+        return self.winner
+
+
+def benchmark(sizes=(1, 100, 10000), seed=0, near=True):
+    """
+    Partidas aleatorias completas por segundo para varios tamaños de lote.
+    :return: Lista de diccionarios con partidas, segundos, partidas/s, movimientos medios y victorias.
+    """
+    rows = []
+    for games in sizes:
+        batch = BatchBoard(games, seed=seed)
+        start = time.perf_counter()
+        winners = batch.play(near=near)
+        elapsed = time.perf_counter() - start
+        rows.append({
+            "games": games, "seconds": elapsed, "games_per_second": games / elapsed,
+            "mean_moves": float(batch.moves.mean()),
+            "x_wins": int((winners == X).sum()), "o_wins": int((winners == O).sum()),
+            "draws": int((winners == DRAW).sum()),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rendimiento del simulador por lotes")
+    parser.add_argument("--sizes", default="1,100,10000", help="Tamaños de lote, separados por comas")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de las partidas")
+    parser.add_argument("--anywhere", action="store_true", help="Jugadas en todo el tablero, no solo cerca")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    print(f"{'partidas':>8} {'segundos':>9} {'partidas/s':>11} {'movs.':>6} {'X':>6} {'O':>6} {'tablas':>6}")
+    for row in benchmark(sizes, args.seed, near=not args.anywhere):
+        print(
+            f"{row['games']:>8} {row['seconds']:>9.3f} {row['games_per_second']:>11.1f} "
+            f"{row['mean_moves']:>6.1f} {row['x_wins']:>6} {row['o_wins']:>6} {row['draws']:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
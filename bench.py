@@ -0,0 +1,248 @@
+# bench.py
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+from ai import AIPlayer
+from positions import POSITIONS, load_position
+
+BENCH_VERSION = 1
+DEFAULT_THRESHOLD = 0.25  # Empeoramiento relativo de un tiempo que se considera regresión
+
+
+def _best_of(repeat, run):
+    """
+    Ejecuta run varias veces y se queda con la medida más rápida (la menos
+    afectada por el ruido del sistema).
+    :param run: Función sin argumentos que devuelve (segundos, llamadas).
+    :return: Microsegundos por llamada.
+    """
+    best = None
+    for _ in range(repeat):
+        seconds, calls = run()
+        per_call = seconds / max(calls, 1) * 1e6
+        if best is None or per_call < best:
+            best = per_call
+    return best
+
+
+def bench_make_move(board):
+    """make_move de cada candidata, deshecho con pop (incluido en la medida)."""
+    symbol = board.turn
+    moves = board.candidate_moves()
+
+    def run():
+        start = time.perf_counter()
+        for move in moves:
+            if board.make_move(move, symbol):
+                board.pop()
+        return time.perf_counter() - start, len(moves)
+    return run
+
+
+def bench_has_alignment(board):
+    """has_alignment de ambos jugadores, restaurando las banderas que modifica."""
+    flags = board.towinx, board.towino
+
+    def run():
+        calls = 0
+        start = time.perf_counter()
+        for _ in range(200):
+            for symbol in ("X", "O"):
+                board.has_alignment(symbol)
+                board.towinx, board.towino = flags
+                calls += 1
+        return time.perf_counter() - start, calls
+    return run
+
+
+def bench_double_threes(board):
+    """introduces_double_threes en todas las candidatas para ambos jugadores."""
+    cells = board.candidate_moves()
+
+    def run():
+        start = time.perf_counter()
+        for row, col in cells:
+            board.introduces_double_threes(row, col, "X")
+            board.introduces_double_threes(row, col, "O")
+        return time.perf_counter() - start, 2 * len(cells)
+    return run
+
+
+def bench_capture(board):
+    """
+    check_and_execute_capture tras colocar en cada candidata (solo se mide la
+    llamada; la ficha, las capturas y las banderas se restauran después).
+    """
+    symbol = board.turn
+    opponent = "X" if symbol == "O" else "O"
+    moves = [move for move in board.candidate_moves() if board.is_valid_move(move, symbol)]
+
+    def run():
+        elapsed = 0.0
+        for row, col in moves:
+            state = (dict(board.captures), board.towinx, board.towino, board.acabose)
+            board._place(row, col, symbol)
+            start = time.perf_counter()
+            captured = board.check_and_execute_capture(row, col, symbol)
+            elapsed += time.perf_counter() - start
+            for r, c in captured:
+                board._place(r, c, opponent)
+            board._remove(row, col)
+            captures, board.towinx, board.towino, board.acabose = state
+            board._set_captures("X", captures["X"])
+            board._set_captures("O", captures["O"])
+        return elapsed, len(moves)
+    return run
+
+
+def bench_evaluate(board):
+    """evaluate_board tras cada movimiento candidato (con sus líneas por recalcular)."""
+    symbol = board.turn
+    player = AIPlayer("bench", symbol, tt_entries=1 << 10)
+    moves = board.candidate_moves()
+
+    def run():
+        elapsed = 0.0
+        calls = 0
+        for move in moves:
+            if not board.push(move, symbol):
+                continue
+            start = time.perf_counter()
+            player.evaluate_board(board)
+            elapsed += time.perf_counter() - start
+            calls += 1
+            board.pop()
+        return elapsed, calls
+    return run
+
+
+def bench_best_move(name, depth):
+    """
+    get_best_move completo con una IA nueva a profundidad fija y con la búsqueda
+    de amenazas limitada por nodos, no por tiempo, para que el trabajo sea el
+    mismo en cada ejecución.
+    """
+    def run():
+        board = load_position(name)
+        player = AIPlayer(
+            "bench", board.turn, tt_entries=1 << 16, max_depth=depth, threat_nodes=200, threat_time=None,
+        )
+        start = time.perf_counter()
+        player.get_best_move(board, None)
+        return time.perf_counter() - start, 1
+    return run
+
+
+def perft(board, symbol, depth):
+    """
+    Cuenta las hojas del árbol de movimientos legales hasta depth plies con el
+    generador de candidatas. Las posiciones ganadas cuentan como hoja.
+    :return: Número de hojas.
+    """
+    if depth == 0:
+        return 1
+    opponent = "X" if symbol == "O" else "O"
+    leaves = 0
+    for move in board.candidate_moves():
+        if not board.push(move, symbol):
+            continue
+        board.check_winner(symbol)
+        if depth == 1 or board.winner() is not None:
+            leaves += 1
+        else:
+            leaves += perft(board, opponent, depth - 1)
+        board.pop()
+    return leaves
+
+
+def run_suite(names=None, repeat=3, search_depth=2, perft_depth=2):
+    """
+    Mide los caminos críticos en las posiciones de referencia.
+    :param names: Posiciones de positions.py (por defecto, todas).
+    :param repeat: Repeticiones de cada medida (se toma la mejor).
+    :param search_depth: Profundidad fija de get_best_move.
+    :param perft_depth: Profundidad del recuento perft (0 = sin perft).
+    :return: Diccionario serializable con tiempos ("timings", microsegundos por
+             llamada) y recuentos exactos ("counts").
+    """
+    timings = {}
+    counts = {}
+    for name in names or list(POSITIONS):
+        board = load_position(name)
+        for metric, factory in (
+            ("make_move", bench_make_move),
+            ("has_alignment", bench_has_alignment),
+            ("introduces_double_threes", bench_double_threes),
+            ("check_and_execute_capture", bench_capture),
+            ("evaluate_board", bench_evaluate),
+        ):
+            timings[f"{name}.{metric}"] = _best_of(repeat, factory(board))
+        timings[f"{name}.get_best_move"] = _best_of(repeat, bench_best_move(name, search_depth))
+        if perft_depth:
+            start = time.perf_counter()
+            leaves = perft(board, board.turn, perft_depth)
+            elapsed = time.perf_counter() - start
+            counts[f"{name}.perft{perft_depth}"] = leaves
+            timings[f"{name}.perft{perft_depth}_per_leaf"] = elapsed / max(leaves, 1) * 1e6
+    return {
+        "version": BENCH_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "settings": {"repeat": repeat, "search_depth": search_depth, "perft_depth": perft_depth},
+        "timings": timings,
+        "counts": counts,
+    }
+
+
+def compare(result, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compara un resultado con una referencia guardada.
+    :param threshold: Empeoramiento relativo permitido en los tiempos (0.25 = 25 %).
+    :return: Lista de regresiones (textos); vacía si no hay ninguna. Un recuento
+             distinto siempre es regresión: indica un cambio de comportamiento.
+    """
+    problems = []
+    for metric, value in sorted(result["timings"].items()):
+        reference = baseline.get("timings", {}).get(metric)
+        if reference and value > reference * (1.0 + threshold):
+            problems.append(f"{metric}: {value:.2f} us frente a {reference:.2f} us (+{value / reference - 1:.0%})")
+    for metric, value in sorted(result["counts"].items()):
+        reference = baseline.get("counts", {}).get(metric)
+        if reference is not None and value != reference:
+            problems.append(f"{metric}: {value} frente a {reference}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pruebas de rendimiento de los caminos críticos del motor")
+    parser.add_argument("--positions", default=",".join(POSITIONS), help="Posiciones, separadas por comas")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones de cada medida (se toma la mejor)")
+    parser.add_argument("--depth", type=int, default=2, help="Profundidad fija de get_best_move")
+    parser.add_argument("--perft", type=int, default=2, help="Profundidad de perft (0 = sin perft)")
+    parser.add_argument("--output", help="Archivo donde guardar el resultado en JSON")
+    parser.add_argument("--baseline", help="Resultado de referencia con el que comparar")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Empeoramiento relativo permitido (0.25 = 25 %%)")
+    args = parser.parse_args()
+    result = run_suite(args.positions.split(","), args.repeat, args.depth, args.perft)
+    text = json.dumps(result, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    print(text)
+    if args.baseline:
+        with open(args.baseline) as source:
+            baseline = json.load(source)
+        problems = compare(result, baseline, args.threshold)
+        for problem in problems:
+            print("Regresión: " + problem, file=sys.stderr)
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
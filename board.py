@@ -1,8 +1,196 @@
 # board.py
 
-class Board:
+import random
+import struct
+from itertools import product
+
+from linepatterns import DOUBLE_THREE, OWN, RIVAL, SEGMENT_MASK, TABLE, line_code
+from patterns import CAPTURE_RISK, CAPTURE_THREAT, score_line
+
+DIRECTIONS = [(1, 0), (0, 1), (1, 1), (1, -1)]  # Vertical, horizontal, diagonales
+ZOBRIST_SEED = 0x60D0CC  # Semilla fija: las claves coinciden entre procesos y ejecuciones
+THREE_REACH = 3  # El recuento del doble tres no mira más allá de 3 casillas de la jugada
+
+# Instantánea binaria (to_bytes): cabecera de lado, capturas de X y de O, banderas
+# (towinx, towino, acabose y firstmove, 2 bits cada una) y turno, seguida de las
+# casillas a 2 bits (4 por byte, la primera en los bits bajos)
+SNAPSHOT_HEADER = struct.Struct("<5B")
+SNAPSHOT_SYMBOLS = ".XOS"  # Código de 2 bits de casillas y banderas
+_SNAPSHOT_ENCODE = {
+    "".join(cells): sum(SNAPSHOT_SYMBOLS.index(symbol) << (2 * k) for k, symbol in enumerate(cells))
+    for cells in product(".XO", repeat=4)
+}
+_SNAPSHOT_DECODE = [
+    "".join(SNAPSHOT_SYMBOLS[(byte >> (2 * k)) & 3] for k in range(4)) for byte in range(256)
+]
+
+
+def snapshot_size(size):
+    """Bytes de la instantánea binaria de un tablero de lado size."""
+    return SNAPSHOT_HEADER.size + (size * size + 3) // 4
+
+
+class BoardGeometry:
+    """
+    Máscaras precalculadas para representar el tablero como bitboards.
+    La casilla (fila, columna) corresponde al bit fila * size + columna.
+    """
+
     def __init__(self, size):
-        """Inicializa el tablero de juego."""
+        self.size = size
+        self.cells = size * size
+        self.full = (1 << self.cells) - 1
+        # Desplazamiento de bits de un paso en cada dirección de DIRECTIONS
+        self.shifts = [dr * size + dc for dr, dc in DIRECTIONS]
+        # Casillas cuyo vecino en la dirección dada sigue dentro del tablero
+        # (evita que los desplazamientos den la vuelta de una fila a otra)
+        self.shift_masks = []
+        # Y las casillas cuyo vecino en sentido contrario sigue dentro del tablero
+        self.back_masks = []
+        for dr, dc in DIRECTIONS:
+            mask = 0
+            back = 0
+            for row in range(size):
+                for col in range(size):
+                    if 0 <= row + dr < size and 0 <= col + dc < size:
+                        mask |= 1 << (row * size + col)
+                    if 0 <= row - dr < size and 0 <= col - dc < size:
+                        back |= 1 << (row * size + col)
+            self.shift_masks.append(mask)
+            self.back_masks.append(back)
+        # Rayos de captura por casilla: (bits del par, bit del extremo, par de casillas)
+        # en el mismo orden en que los recorre check_and_execute_capture
+        self.capture_rays = []
+        for row in range(size):
+            for col in range(size):
+                rays = []
+                for dr, dc in DIRECTIONS:
+                    for sign in (1, -1):
+                        r3, c3 = row + 3 * sign * dr, col + 3 * sign * dc
+                        if not (0 <= r3 < size and 0 <= c3 < size):
+                            continue
+                        r1, c1 = row + sign * dr, col + sign * dc
+                        r2, c2 = row + 2 * sign * dr, col + 2 * sign * dc
+                        pair = (1 << (r1 * size + c1)) | (1 << (r2 * size + c2))
+                        rays.append((pair, 1 << (r3 * size + c3), (r1, c1), (r2, c2)))
+                self.capture_rays.append(rays)
+        # Ventanas de 5 casillas alineadas, numeradas en orden (fila, columna, dirección)
+        # para que recorrerlas por identificador equivalga a barrer el tablero
+        self.windows = []
+        self.window_cells = []
+        self.windows_by_cell = [[] for _ in range(self.cells)]
+        for row in range(size):
+            for col in range(size):
+                for d, (dr, dc) in enumerate(DIRECTIONS):
+                    end_r, end_c = row + 4 * dr, col + 4 * dc
+                    if not (0 <= end_r < size and 0 <= end_c < size):
+                        continue
+                    wid = len(self.windows)
+                    self.windows.append((row, col, d))
+                    cells = []
+                    for step in range(5):
+                        r, c = row + dr * step, col + dc * step
+                        self.windows_by_cell[r * size + c].append(wid)
+                        cells.append((r, c))
+                    self.window_cells.append(tuple(cells))
+        # Claves Zobrist de 64 bits: ficha por casilla, contador de capturas y turno
+        rng = random.Random(ZOBRIST_SEED + size)
+        self.zobrist_cells = {
+            "X": [rng.getrandbits(64) for _ in range(self.cells)],
+            "O": [rng.getrandbits(64) for _ in range(self.cells)],
+        }
+        # La clave del contador 0 es 0 para que el tablero vacío tenga hash 0
+        self.zobrist_captures = {
+            "X": [0] + [rng.getrandbits(64) for _ in range(self.cells)],
+            "O": [0] + [rng.getrandbits(64) for _ in range(self.cells)],
+        }
+        self.zobrist_turn = rng.getrandbits(64)  # Se aplica cuando le toca mover a 'O'
+        # Banderas towinx, towino y acabose: la clave de '.' es 0
+        self.zobrist_flags = [
+            {".": 0, "X": rng.getrandbits(64), "O": rng.getrandbits(64)} for _ in range(3)
+        ]
+        self.coords = [divmod(index, size) for index in range(self.cells)]
+        # Tramos de captura: (extremo, par, par, extremo) en cada dirección, dentro del tablero
+        self.capture_segments = []
+        self.segments_by_cell = [[] for _ in range(self.cells)]
+        for row, col in self.coords:
+            for dr, dc in DIRECTIONS:
+                if not (0 <= row + 3 * dr < size and 0 <= col + 3 * dc < size):
+                    continue
+                sid = len(self.capture_segments)
+                cells = tuple((row + step * dr, col + step * dc) for step in range(4))
+                self.capture_segments.append(cells)
+                for r, c in cells:
+                    self.segments_by_cell[r * size + c].append(sid)
+        # Líneas completas en cada dirección (de al menos 4 casillas, lo que ocupa una captura)
+        self.lines = []
+        self.lines_by_cell = [[] for _ in range(self.cells)]
+        # Por casilla: (línea, desplazamiento de bits de la casilla en el código de la línea)
+        self.line_slots = [[] for _ in range(self.cells)]
+        self.line_indices = []  # Índices de bit de las casillas de cada línea
+        for dr, dc in DIRECTIONS:
+            for row, col in self.coords:
+                if 0 <= row - dr < size and 0 <= col - dc < size:
+                    continue  # No es el primer punto de la línea
+                cells = []
+                r, c = row, col
+                while 0 <= r < size and 0 <= c < size:
+                    cells.append((r, c))
+                    r, c = r + dr, c + dc
+                if len(cells) < 4:
+                    continue
+                lid = len(self.lines)
+                self.lines.append(tuple(cells))
+                self.line_indices.append(tuple(r * size + c for r, c in cells))
+                for position, (r, c) in enumerate(cells):
+                    self.lines_by_cell[r * size + c].append(lid)
+                    self.line_slots[r * size + c].append((lid, 2 * (position + 4)))
+        self.empty_line_codes = [line_code([0] * len(line)) for line in self.lines]
+        self._neighborhoods = {}
+
+    def neighborhood(self, radius):
+        """
+        Casillas a distancia (Chebyshev) entre 1 y radius de cada casilla.
+        :param radius: Radio del vecindario.
+        :return: Lista, por índice de casilla, de los índices vecinos.
+        """
+        neighborhoods = self._neighborhoods.get(radius)
+        if neighborhoods is None:
+            size = self.size
+            neighborhoods = []
+            for row, col in self.coords:
+                cells = []
+                for r in range(max(0, row - radius), min(size, row + radius + 1)):
+                    for c in range(max(0, col - radius), min(size, col + radius + 1)):
+                        if (r, c) != (row, col):
+                            cells.append(r * size + c)
+                neighborhoods.append(cells)
+            self._neighborhoods[radius] = neighborhoods
+        return neighborhoods
+
+    def capture_key(self, symbol, count):
+        """Clave Zobrist del contador de capturas de un jugador."""
+        return self.zobrist_captures[symbol][min(count, self.cells)]
+
+
+_GEOMETRIES = {}
+
+
+def get_geometry(size):
+    """Devuelve (y cachea) la geometría de bitboards para un tamaño de tablero."""
+    geometry = _GEOMETRIES.get(size)
+    if geometry is None:
+        geometry = _GEOMETRIES[size] = BoardGeometry(size)
+    return geometry
+
+
+class Board:
+    def __init__(self, size, candidate_radius=2):
+        """
+        Inicializa el tablero de juego.
+        :param size: Lado del tablero.
+        :param candidate_radius: Distancia a las fichas de las casillas candidatas.
+        """
         self.size = size
         self.grid = [["." for _ in range(size)] for _ in range(size)]
         self.captures = {"X": 0, "O": 0}  # Capturas acumuladas por cada jugador
@@ -10,6 +198,363 @@ class Board:
         self.towino = "."
         self.acabose = "."
         self.firstmove = "S"
+        # Representación en bitboards: un entero por jugador, sincronizado con grid
+        self.geometry = get_geometry(size)
+        self.bits = {"X": 0, "O": 0}
+        # Índice de alineaciones: fichas de cada jugador por ventana de 5 y ventanas completas
+        self.window_counts = {
+            "X": [0] * len(self.geometry.windows),
+            "O": [0] * len(self.geometry.windows),
+        }
+        # Ventanas agrupadas por número de fichas del jugador (de 2 a 5)
+        self.window_sets = {
+            "X": [None, None, set(), set(), set(), set()],
+            "O": [None, None, set(), set(), set(), set()],
+        }
+        self.fives = {"X": self.window_sets["X"][5], "O": self.window_sets["O"][5]}
+        self.fours = {"X": self.window_sets["X"][4], "O": self.window_sets["O"][4]}  # A una ficha de 5
+        self.threes = {"X": self.window_sets["X"][3], "O": self.window_sets["O"][3]}
+        # Puntuación de patrones por línea; solo se recalculan las líneas modificadas
+        self.line_scores = {
+            "X": [0] * len(self.geometry.lines),
+            "O": [0] * len(self.geometry.lines),
+        }
+        self.pattern_totals = {"X": 0, "O": 0}
+        self.dirty_lines = set()
+        # Código de 2 bits por casilla de cada línea, visto desde cada jugador (ver linepatterns.py)
+        self.line_codes = {
+            "X": list(self.geometry.empty_line_codes),
+            "O": list(self.geometry.empty_line_codes),
+        }
+        # Mapa de casillas prohibidas por la regla del doble tres. Por línea, bits de las
+        # posiciones donde jugar forma un tres; por casilla, cuántas líneas lo forman.
+        # Se actualiza al consultarlo, solo alrededor de las casillas modificadas.
+        self.line_threes = {
+            "X": [0] * len(self.geometry.lines),
+            "O": [0] * len(self.geometry.lines),
+        }
+        self.three_counts = {"X": [0] * self.geometry.cells, "O": [0] * self.geometry.cells}
+        self.forbidden_bits = {"X": 0, "O": 0}
+        self.dirty_cells = set()
+        # Índice de capturas: pares de cada jugador que el rival puede capturar
+        # (par -> casilla de la captura) y, por atacante, casilla -> pares que se
+        # llevaría. Se mantiene al poner y quitar fichas, tramo a tramo.
+        self.capturable = {"X": {}, "O": {}}
+        self.capture_moves = {"X": {}, "O": {}}
+        self.segment_captures = [None] * len(self.geometry.capture_segments)
+        # Pila de registros para deshacer movimientos completos (ver push/pop)
+        self.move_stack = []
+        # Jugador al que le toca mover y hash Zobrist incremental de la posición
+        self.turn = "X"
+        self._zobrist = 0
+        # Casillas candidatas: vacías y a distancia <= candidate_radius de alguna ficha
+        self.set_candidate_radius(candidate_radius)
+
+    def set_candidate_radius(self, radius):
+        """
+        Cambia el radio del generador de candidatas y lo reconstruye.
+        :param radius: Distancia máxima (1 o 2 normalmente) a una ficha existente.
+        """
+        self.candidate_radius = radius
+        self._neighbors = self.geometry.neighborhood(radius)
+        self.near_counts = [0] * self.geometry.cells
+        self.candidates = set()
+        occupied = self.bits["X"] | self.bits["O"]
+        coords = self.geometry.coords
+        for index in range(self.geometry.cells):
+            if occupied >> index & 1:
+                for near in self._neighbors[index]:
+                    self.near_counts[near] += 1
+        for index in range(self.geometry.cells):
+            if self.near_counts[index] and not occupied >> index & 1:
+                self.candidates.add(coords[index])
+
+    def candidate_moves(self):
+        """
+        Devuelve las casillas vacías cercanas a alguna ficha, en orden de fila y columna.
+        Con el tablero vacío devuelve solo el centro.
+        :return: Lista de tuplas (fila, columna).
+        """
+        if not self.candidates:
+            if self.bits["X"] | self.bits["O"]:
+                return self.get_empty_positions()
+            return [(self.size // 2, self.size // 2)]
+        return sorted(self.candidates)
+
+    @property
+    def zobrist(self):
+        """Huella de 64 bits de la posición: fichas, capturas y turno."""
+        return self._zobrist
+
+    @property
+    def search_key(self):
+        """
+        Clave para la tabla de transposiciones: el hash Zobrist más las banderas
+        de cinco pendiente de captura y de fin de partida, que también deciden
+        el resultado de una posición.
+        """
+        flags = self.geometry.zobrist_flags
+        return self._zobrist ^ flags[0][self.towinx] ^ flags[1][self.towino] ^ flags[2][self.acabose]
+
+    def compute_zobrist(self):
+        """
+        Calcula el hash Zobrist desde cero (el incremental debe coincidir siempre).
+        :return: Entero de 64 bits.
+        """
+        geometry = self.geometry
+        key = 0
+        for row in range(self.size):
+            for col in range(self.size):
+                symbol = self.grid[row][col]
+                if symbol != ".":
+                    key ^= geometry.zobrist_cells[symbol][row * self.size + col]
+        key ^= geometry.capture_key("X", self.captures["X"])
+        key ^= geometry.capture_key("O", self.captures["O"])
+        if self.turn == "O":
+            key ^= geometry.zobrist_turn
+        return key
+
+    def _set_turn(self, symbol):
+        """Cambia el jugador al que le toca mover, actualizando el hash."""
+        if (symbol == "O") != (self.turn == "O"):
+            self._zobrist ^= self.geometry.zobrist_turn
+        self.turn = symbol
+
+    def _set_captures(self, symbol, count):
+        """Cambia el contador de capturas de un jugador, actualizando el hash."""
+        geometry = self.geometry
+        self._zobrist ^= geometry.capture_key(symbol, self.captures[symbol])
+        self._zobrist ^= geometry.capture_key(symbol, count)
+        self.captures[symbol] = count
+
+    def _place(self, row, col, symbol):
+        """Coloca una ficha en grid y en el bitboard del jugador."""
+        index = row * self.size + col
+        self.grid[row][col] = symbol
+        self.bits[symbol] |= 1 << index
+        self._zobrist ^= self.geometry.zobrist_cells[symbol][index]
+        self.dirty_lines.update(self.geometry.lines_by_cell[index])
+        self.dirty_cells.add(index)
+        own_codes = self.line_codes[symbol]
+        rival_codes = self.line_codes["X" if symbol == "O" else "O"]
+        for lid, shift in self.geometry.line_slots[index]:
+            own_codes[lid] += OWN << shift
+            rival_codes[lid] += RIVAL << shift
+        counts = self.window_counts[symbol]
+        window_sets = self.window_sets[symbol]
+        for wid in self.geometry.windows_by_cell[index]:
+            count = counts[wid] + 1
+            counts[wid] = count
+            if count >= 2:
+                window_sets[count].add(wid)
+                if count > 2:
+                    window_sets[count - 1].discard(wid)
+        self._update_captures(index)
+        coords = self.geometry.coords
+        grid = self.grid
+        near_counts = self.near_counts
+        self.candidates.discard(coords[index])
+        for near in self._neighbors[index]:
+            near_counts[near] += 1
+            r, c = coords[near]
+            if grid[r][c] == ".":
+                self.candidates.add(coords[near])
+
+    def _remove(self, row, col):
+        """Retira la ficha de una casilla de grid y de su bitboard."""
+        symbol = self.grid[row][col]
+        if symbol == ".":
+            return
+        index = row * self.size + col
+        self.grid[row][col] = "."
+        self.bits[symbol] &= ~(1 << index)
+        self._zobrist ^= self.geometry.zobrist_cells[symbol][index]
+        self.dirty_lines.update(self.geometry.lines_by_cell[index])
+        self.dirty_cells.add(index)
+        own_codes = self.line_codes[symbol]
+        rival_codes = self.line_codes["X" if symbol == "O" else "O"]
+        for lid, shift in self.geometry.line_slots[index]:
+            own_codes[lid] -= OWN << shift
+            rival_codes[lid] -= RIVAL << shift
+        counts = self.window_counts[symbol]
+        window_sets = self.window_sets[symbol]
+        for wid in self.geometry.windows_by_cell[index]:
+            count = counts[wid]
+            if count >= 2:
+                window_sets[count].discard(wid)
+                if count > 2:
+                    window_sets[count - 1].add(wid)
+            counts[wid] = count - 1
+        self._update_captures(index)
+        # La casilla liberada (también por captura) vuelve a ser candidata si tiene vecinas
+        coords = self.geometry.coords
+        near_counts = self.near_counts
+        for near in self._neighbors[index]:
+            near_counts[near] -= 1
+            if not near_counts[near]:
+                self.candidates.discard(coords[near])
+        if near_counts[index]:
+            self.candidates.add(coords[index])
+
+    def _update_captures(self, index):
+        """
+        Revisa los tramos de captura que pasan por una casilla recién modificada
+        y actualiza capturable y capture_moves.
+        """
+        grid = self.grid
+        segments = self.geometry.capture_segments
+        states = self.segment_captures
+        for sid in self.geometry.segments_by_cell[index]:
+            end1, first, second, end2 = segments[sid]
+            owner = grid[first[0]][first[1]]
+            state = None
+            if owner != "." and grid[second[0]][second[1]] == owner:
+                # Par capturable: un extremo vacío y el otro del rival
+                before = grid[end1[0]][end1[1]]
+                after = grid[end2[0]][end2[1]]
+                if before == "." and after not in (".", owner):
+                    state = (owner, end1)
+                elif after == "." and before not in (".", owner):
+                    state = (owner, end2)
+            old = states[sid]
+            if old == state:
+                continue
+            states[sid] = state
+            if old is not None:
+                old_owner, cell = old
+                del self.capturable[old_owner][(first, second)]
+                moves = self.capture_moves["X" if old_owner == "O" else "O"]
+                if moves[cell] == 1:
+                    del moves[cell]
+                else:
+                    moves[cell] -= 1
+            if state is not None:
+                self.capturable[owner][(first, second)] = state[1]
+                moves = self.capture_moves["X" if owner == "O" else "O"]
+                moves[state[1]] = moves.get(state[1], 0) + 1
+
+    def snapshot(self):
+        """
+        Copia compacta y serializable de la posición (sin la pila de deshacer),
+        para enviarla a otros procesos.
+        :return: Tupla (casillas, capturas X, capturas O, towinx, towino, acabose, firstmove, turno).
+        """
+        return (
+            "".join(["".join(row) for row in self.grid]),
+            self.captures["X"],
+            self.captures["O"],
+            self.towinx,
+            self.towino,
+            self.acabose,
+            self.firstmove,
+            self.turn,
+        )
+
+    def to_bytes(self, buffer=None, offset=0):
+        """
+        Instantánea binaria de tamaño fijo (snapshot_size) de la posición, sin la
+        pila de deshacer: sirve de clave de caché, para enviarla a otros procesos
+        o para guardar muchas posiciones seguidas en un mismo búfer.
+        :param buffer: Búfer escribible (bytearray, memoryview, SharedMemory.buf)
+                       donde escribirla; None para devolver bytes nuevos.
+        :param offset: Posición de la instantánea dentro de buffer.
+        :return: bytes, o None si se escribió en buffer.
+        """
+        cells = "".join(["".join(row) for row in self.grid])
+        cells += "." * (-len(cells) % 4)
+        encode = _SNAPSHOT_ENCODE
+        packed = bytes([encode[cells[i:i + 4]] for i in range(0, len(cells), 4)])
+        code = SNAPSHOT_SYMBOLS.index
+        flags = code(self.towinx) | code(self.towino) << 2 | code(self.acabose) << 4 | code(self.firstmove) << 6
+        header = (self.size, self.captures["X"], self.captures["O"], flags, code(self.turn))
+        if buffer is None:
+            return SNAPSHOT_HEADER.pack(*header) + packed
+        SNAPSHOT_HEADER.pack_into(buffer, offset, *header)
+        start = offset + SNAPSHOT_HEADER.size
+        buffer[start:start + len(packed)] = packed
+        return None
+
+    @classmethod
+    def from_bytes(cls, data, offset=0, candidate_radius=2):
+        """
+        Reconstruye un tablero a partir de to_bytes(). Lee directamente del
+        búfer (también uno compartido entre procesos) sin copiarlo.
+        :param data: Objeto con interfaz de búfer (bytes, bytearray, memoryview...).
+        :param offset: Posición de la instantánea dentro de data.
+        :param candidate_radius: Radio del generador de candidatas.
+        :return: Nueva instancia de Board.
+        """
+        view = memoryview(data)
+        size, captures_x, captures_o, flags, turn = SNAPSHOT_HEADER.unpack_from(view, offset)
+        start = offset + SNAPSHOT_HEADER.size
+        end = offset + snapshot_size(size)
+        if len(view) < end:
+            raise ValueError(f"Instantánea incompleta: {len(view) - offset} de {end - offset} bytes")
+        decode = _SNAPSHOT_DECODE
+        cells = "".join([decode[byte] for byte in view[start:end]])
+        if "S" in cells[:size * size]:
+            raise ValueError("Instantánea con casillas no válidas")
+        board = cls(size, candidate_radius)
+        for index, symbol in enumerate(cells[:size * size]):
+            if symbol != ".":
+                board._place(index // size, index % size, symbol)
+        board._set_captures("X", captures_x)
+        board._set_captures("O", captures_o)
+        board.towinx = SNAPSHOT_SYMBOLS[flags & 3]
+        board.towino = SNAPSHOT_SYMBOLS[(flags >> 2) & 3]
+        board.acabose = SNAPSHOT_SYMBOLS[(flags >> 4) & 3]
+        board.firstmove = SNAPSHOT_SYMBOLS[flags >> 6]
+        board._set_turn(SNAPSHOT_SYMBOLS[turn])
+        return board
+
+    @classmethod
+    def from_snapshot(cls, snapshot, candidate_radius=2):
+        """
+        Reconstruye un tablero a partir de snapshot().
+        :param snapshot: Tupla devuelta por snapshot().
+        :param candidate_radius: Radio del generador de candidatas.
+        :return: Nueva instancia de Board.
+        """
+        cells, captures_x, captures_o, towinx, towino, acabose, firstmove, turn = snapshot
+        size = int(round(len(cells) ** 0.5))
+        board = cls(size, candidate_radius)
+        for index, symbol in enumerate(cells):
+            if symbol != ".":
+                board._place(index // size, index % size, symbol)
+        board._set_captures("X", captures_x)
+        board._set_captures("O", captures_o)
+        board.towinx = towinx
+        board.towino = towino
+        board.acabose = acabose
+        board.firstmove = firstmove
+        board._set_turn(turn)
+        return board
+
+    def pattern_score(self, symbol):
+        """
+        Suma de las puntuaciones de patrones (ver patterns.py) de todas las líneas,
+        más los pares capturables del índice de capturas (propios y rivales).
+        Antes recalcula solo las líneas que han cambiado desde la última consulta.
+        :param symbol: símbolo del jugador ('X' o 'O')
+        :return: Puntuación total del jugador.
+        """
+        if self.dirty_lines:
+            grid = self.grid
+            lines = self.geometry.lines
+            for lid in self.dirty_lines:
+                line = "|" + "".join([grid[r][c] for r, c in lines[lid]]) + "|"
+                for player in ("X", "O"):
+                    scores = self.line_scores[player]
+                    score = score_line(line, player)
+                    self.pattern_totals[player] += score - scores[lid]
+                    scores[lid] = score
+            self.dirty_lines.clear()
+        opponent_symbol = "X" if symbol == "O" else "O"
+        return (
+            self.pattern_totals[symbol]
+            + CAPTURE_THREAT * len(self.capturable[opponent_symbol])
+            + CAPTURE_RISK * len(self.capturable[symbol])
+        )
 
     def display(self):
         """Muestra el tablero en la consola."""
@@ -38,7 +583,10 @@ class Board:
         """
         row, col = move
         if 0 <= row < self.size and 0 <= col < self.size:
-            self.grid[row][col] = "."
+            symbol = self.grid[row][col]
+            if symbol != ".":
+                self._remove(row, col)
+                self._set_turn(symbol)
 
     def make_move(self, move, symbol):
         """
@@ -47,14 +595,60 @@ class Board:
         :param symbol: símbolo del jugador ('X' o 'O')
         :return: True si el movimiento es válido, False si no lo es.
         """
+        return self.push(move, symbol)
+
+    def push(self, move, symbol):
+        """
+        Realiza un movimiento guardando lo necesario para deshacerlo con pop().
+        :param move: (fila, columna)
+        :param symbol: símbolo del jugador ('X' o 'O')
+        :return: True si el movimiento es válido, False si no lo es.
+        """
         row, col = move
-        if self.is_valid_move(move, symbol):
-            self.grid[row][col] = symbol
-            self.check_and_execute_capture(row, col, symbol)  # Verificar si ocurre captura
-            # if self.towin == symbol:
-            #     self.towin = "."
-            return True
-        return False
+        if not self.is_valid_move(move, symbol):
+            return False
+        # Estado previo: capturas y banderas de final de partida
+        record = (
+            move,
+            symbol,
+            self.captures["X"],
+            self.captures["O"],
+            self.towinx,
+            self.towino,
+            self.acabose,
+            self.firstmove,
+            self.turn,
+        )
+        self._place(row, col, symbol)
+        captured = self.check_and_execute_capture(row, col, symbol)  # Verificar si ocurre captura
+        # if self.towin == symbol:
+        #     self.towin = "."
+        self._set_turn("X" if symbol == "O" else "O")
+        self.move_stack.append((record, captured))
+        return True
+
+    def pop(self):
+        """
+        Deshace el último movimiento hecho con push() o make_move(), devolviendo
+        las fichas capturadas, los contadores de capturas y las banderas de final.
+        :return: El movimiento deshecho, o None si la pila está vacía.
+        """
+        if not self.move_stack:
+            return None
+        record, captured = self.move_stack.pop()
+        move, symbol, captures_x, captures_o, towinx, towino, acabose, firstmove, turn = record
+        opponent_symbol = "X" if symbol == "O" else "O"
+        self._remove(*move)
+        for row, col in captured:
+            self._place(row, col, opponent_symbol)
+        self._set_captures("X", captures_x)
+        self._set_captures("O", captures_o)
+        self._set_turn(turn)
+        self.towinx = towinx
+        self.towino = towino
+        self.acabose = acabose
+        self.firstmove = firstmove
+        return move
 
     def make_move_nocap(self, move, symbol):
         """
@@ -65,7 +659,8 @@ class Board:
         """
         row, col = move
         if self.is_valid_move(move, symbol):
-            self.grid[row][col] = symbol
+            self._place(row, col, symbol)
+            self._set_turn("X" if symbol == "O" else "O")
             return True
         return False
 
@@ -105,8 +700,6 @@ class Board:
         :return: False si alguna ficha puede ser capturada, True si ninguna puede serlo.
         """
     
-        o_symbol = "X" if symbol == "O" else "O"
-
         if (self.towino == symbol):
             return True
         if (self.towinx == symbol):
@@ -118,47 +711,11 @@ class Board:
             self.towinx = symbol
 
 
-        directions = [
-            (1, 0),  # Vertical
-            (0, 1),  # Horizontal
-            (1, 1),  # Diagonal descendente
-            (1, -1), # Diagonal ascendente
-            (-1, 0),
-            (0, -1),
-            (-1, 1),
-            (-1, -1)
-        ]
-
-        for step in range(5):  # Revisar las 5 fichas en la alineación
-            check_row = row + dr * step
-            check_col = col + dc * step
-
-            # Para cada ficha, comprobar en todas las direcciones posibles
-            for ddr, ddc in directions:
-                # Coordenadas en los extremos de la configuración
-                prev_r, prev_c = check_row - ddr, check_col - ddc  # Anterior al símbolo
-                next_r, next_c = check_row + ddr * 2, check_col + ddc * 2  # Espacio vacío al final
-
-                # Coordenadas de los dos símbolos centrales
-                mid_r1, mid_c1 = check_row, check_col
-                mid_r2, mid_c2 = check_row + ddr, check_col + ddc
-                
-                
-                # Verificar si la configuración es "enemy + symbol + symbol + espacio"
-                if (
-                    self.grid[prev_r][prev_c] == o_symbol
-                    and self.grid[mid_r1][mid_c1] == symbol
-                    and self.grid[mid_r2][mid_c2] == symbol
-                    and self.grid[next_r][next_c] == "."
-                ):
-                    return False  # Una ficha es capturable
-                if (
-                    self.grid[prev_r][prev_c] == "."
-                    and self.grid[mid_r1][mid_c1] == symbol
-                    and self.grid[mid_r2][mid_c2] == symbol
-                    and self.grid[next_r][next_c] == o_symbol
-                ):
-                    return False
+        # Fichas de la alineación que están en algún par capturable (índice de capturas)
+        cells = {(row + dr * step, col + dc * step) for step in range(5)}
+        for first, second in self.capturable[symbol]:
+            if first in cells or second in cells:
+                return False  # Una ficha es capturable
         return True  # Ninguna ficha es capturable
 
     def ft_mininotcap(self, row, col, symbol):
@@ -181,46 +738,25 @@ class Board:
         if symbol == "O" and self.captures['O'] >= 8:
             return True
 
-        directions = [
-            (1, 0),  # Vertical
-            (0, 1),  # Horizontal
-            (1, 1),  # Diagonal descendente
-            (1, -1), # Diagonal ascendente
-            (-1, 0),
-            (0, -1),
-            (-1, 1),
-            (-1, -1)
-        ]
-
-        check_row = row
-        check_col = col
-
-        # Para cada ficha, comprobar en todas las direcciones posibles
-        for ddr, ddc in directions:
-                # Coordenadas en los extremos de la configuración
-            prev_r, prev_c = check_row - ddr, check_col - ddc  # Anterior al símbolo
-            next_r, next_c = check_row + ddr * 2, check_col + ddc * 2  # Espacio vacío al final
-
-                # Coordenadas de los dos símbolos centrales
-            mid_r1, mid_c1 = check_row, check_col
-            mid_r2, mid_c2 = check_row + ddr, check_col + ddc
-                
-                
-                # Verificar si la configuración es "enemy + symbol + symbol + espacio"
-            if (
-                self.grid[prev_r][prev_c] == o_symbol
-                and self.grid[mid_r1][mid_c1] == "."
-                and self.grid[mid_r2][mid_c2] == symbol
-                and self.grid[next_r][next_c] == "."
-            ):
+        # Tramos de captura que pasan por la casilla (los mismos que mantiene el
+        # índice de capturas): la ficha quedaría capturable si forma pareja con
+        # otra propia y los extremos son uno vacío y otro del rival
+        grid = self.grid
+        segments = self.geometry.capture_segments
+        cell = (row, col)
+        for sid in self.geometry.segments_by_cell[row * self.size + col]:
+            end1, first, second, end2 = segments[sid]
+            if first == cell:
+                partner = second
+            elif second == cell:
+                partner = first
+            else:
+                continue
+            if grid[partner[0]][partner[1]] != symbol:
+                continue
+            ends = (grid[end1[0]][end1[1]], grid[end2[0]][end2[1]])
+            if ends == (o_symbol, ".") or ends == (".", o_symbol):
                 return False  # Una ficha es capturable
-            if (
-                self.grid[prev_r][prev_c] == "."
-                and self.grid[mid_r1][mid_c1] == "."
-                and self.grid[mid_r2][mid_c2] == symbol
-                and self.grid[next_r][next_c] == o_symbol
-            ):
-                return False
         return True  # Ninguna ficha es capturable
 
     def has_alignment(self, symbol):
@@ -229,27 +765,17 @@ class Board:
         :param symbol: símbolo del jugador ('X' o 'O')
         :return: True si hay alineación, False en caso contrario.
         """
-        directions = [(1, 0), (0, 1), (1, 1), (1, -1)]  # Vertical, horizontal, diagonal
-        for row in range(self.size):
-            for col in range(self.size):
-                if self.grid[row][col] != symbol:
-                    continue
-                for dr, dc in directions:
-                    count = 0
-                    for step in range(5):  # Chequear 5 posiciones consecutivas
-                        r, c = row + dr * step, col + dc * step
-                        if (
-                            0 <= r < self.size
-                            and 0 <= c < self.size
-                            and self.grid[r][c] == symbol
-                        ):
-                            count += 1
-                        else:
-                            break
-                    if ((self.towino == symbol or self.towinx == symbol) and count >= 5):
-                        return True
-                    if count >= 5 and self.ft_notcap(row, col, dr, dc, symbol):
-                        return True
+        # Solo se recorren las ventanas completas del índice, en orden de barrido
+        fives = self.fives[symbol]
+        if not fives:
+            return False
+        for wid in sorted(fives):
+            if self.towino == symbol or self.towinx == symbol:
+                return True
+            row, col, d = self.geometry.windows[wid]
+            dr, dc = DIRECTIONS[d]
+            if self.ft_notcap(row, col, dr, dc, symbol):
+                return True
         return False
 
     def is_valid_move(self, move, symbol):
@@ -260,10 +786,69 @@ class Board:
         if self.grid[row][col] != ".":
             return False
 
-    # Comprobar la regla de "No doble tres"
-        if self.introduces_double_threes(row, col, symbol):
+    # Comprobar la regla de "No doble tres": con el mapa de prohibidas al día basta
+    # un bit; si no, cuatro consultas a la tabla salen más baratas que actualizarlo
+        if not self.dirty_cells:
+            if self.forbidden_bits[symbol] >> (row * self.size + col) & 1:
+                return False
+        elif self.introduces_double_threes(row, col, symbol):
             return False
         return True
+
+    def forbidden(self, symbol):
+        """
+        Casillas vacías donde el jugador no puede mover por la regla del doble
+        tres, las mismas que introduces_double_threes. Antes de responder
+        recalcula solo los tramos de línea alrededor de las casillas modificadas.
+        :param symbol: Símbolo del jugador ('X' o 'O').
+        :return: Entero con un bit por casilla (fila * size + columna).
+        """
+        if self.dirty_cells:
+            geometry = self.geometry
+            # Tramos de línea afectados: (línea, primera posición, última posición)
+            spans = {}
+            for index in self.dirty_cells:
+                for lid, shift in geometry.line_slots[index]:
+                    position = shift // 2 - 4
+                    first = max(position - THREE_REACH, 0)
+                    last = min(position + THREE_REACH, len(geometry.lines[lid]) - 1)
+                    span = spans.get(lid)
+                    if span is not None:
+                        first, last = min(first, span[0]), max(last, span[1])
+                    spans[lid] = (first, last)
+            self.dirty_cells.clear()
+            for player in ("X", "O"):
+                codes = self.line_codes[player]
+                line_threes = self.line_threes[player]
+                counts = self.three_counts[player]
+                bits = self.forbidden_bits[player]
+                for lid, (first, last) in spans.items():
+                    code = codes[lid]
+                    old = line_threes[lid]
+                    new = old
+                    for position in range(first, last + 1):
+                        if TABLE[(code >> (2 * position)) & SEGMENT_MASK] & DOUBLE_THREE:
+                            new |= 1 << position
+                        else:
+                            new &= ~(1 << position)
+                    if new == old:
+                        continue
+                    line_threes[lid] = new
+                    indices = geometry.line_indices[lid]
+                    changed = old ^ new
+                    while changed:
+                        low = changed & -changed
+                        position = low.bit_length() - 1
+                        changed ^= low
+                        index = indices[position]
+                        count = counts[index] + (1 if new & low else -1)
+                        counts[index] = count
+                        if count >= 2:
+                            bits |= 1 << index
+                        else:
+                            bits &= ~(1 << index)
+                self.forbidden_bits[player] = bits
+        return self.forbidden_bits[symbol]
     
     def introduces_double_threes(self, row, col, symbol):
         """
@@ -273,101 +858,137 @@ class Board:
         :param symbol: Símbolo del jugador ('X' o 'O').
         :return: True si el movimiento crea un doble tres, False en caso contrario.
         """
-        directions = [(1, 0), (0, 1), (1, 1), (1, -1)]  # Vertical, horizontal, diagonal
+        # Una consulta a la tabla de patrones por línea (ver linepatterns.classify)
         open_threes = 0
-
-        for dr, dc in directions:
-            count = 1  # Incluye la posición actual
-            open_ends = 0
-
-            for step in range(1, 5):  # Hacia adelante
-                r, c = row + dr * step, col + dc * step
-                if 0 <= r < self.size and 0 <= c < self.size:
-                    if self.grid[r][c] == symbol:
-                        count += 1
-                    elif self.grid[r][c] == ".":
-                        open_ends += 1
-                        break
-                    else:
-                        break
-
-            for step in range(1, 5):  # Hacia atrás
-                r, c = row - dr * step, col - dc * step
-                if 0 <= r < self.size and 0 <= c < self.size:
-                    if self.grid[r][c] == symbol:
-                        count += 1
-                    elif self.grid[r][c] == ".":
-                        open_ends += 1
-                        break
-                    else:
-                        break
-
-            if count == 3 and open_ends == 2:  # Verifica un tres abierto
+        for flags in self.move_patterns(row, col, symbol):
+            if flags & DOUBLE_THREE:
                 open_threes += 1
-
         return open_threes >= 2
 
+    def move_patterns(self, row, col, symbol):
+        """
+        Clases de patrón (bits de linepatterns.py) que formaría el jugador
+        colocando en la casilla vacía, con una consulta a la tabla por línea.
+        :return: Lista de enteros, uno por línea que pasa por la casilla.
+        """
+        codes = self.line_codes[symbol]
+        return [
+            TABLE[(codes[lid] >> (shift - 8)) & SEGMENT_MASK]
+            for lid, shift in self.geometry.line_slots[row * self.size + col]
+        ]
+
+    def five_cells(self, symbol):
+        """
+        Casillas vacías donde el jugador completaría una línea de 5.
+        :return: Conjunto de tuplas (fila, columna).
+        """
+        opponent_counts = self.window_counts["X" if symbol == "O" else "O"]
+        cells = set()
+        for wid in self.fours[symbol]:
+            if opponent_counts[wid]:
+                continue
+            for row, col in self.geometry.window_cells[wid]:
+                if self.grid[row][col] == ".":
+                    cells.add((row, col))
+        return cells
+
+    def four_cells(self, symbol):
+        """
+        Casillas vacías donde el jugador dejaría 4 fichas en una ventana de 5 libre
+        de fichas rivales (amenaza de cinco).
+        :return: Conjunto de tuplas (fila, columna).
+        """
+        opponent_counts = self.window_counts["X" if symbol == "O" else "O"]
+        cells = set()
+        for wid in self.threes[symbol]:
+            if opponent_counts[wid]:
+                continue
+            for row, col in self.geometry.window_cells[wid]:
+                if self.grid[row][col] == ".":
+                    cells.add((row, col))
+        return cells
+
+    def capture_cells(self, symbol):
+        """
+        Casillas en las que el jugador capturaría algún par rival.
+        :return: Conjunto de tuplas (fila, columna).
+        """
+        return set(self.capture_moves[symbol])
+
+    def capture_count(self, row, col, symbol):
+        """
+        Cuenta los pares enemigos que capturaría el jugador colocando en la casilla.
+        :return: Número de pares capturables.
+        """
+        return self.capture_moves[symbol].get((row, col), 0)
+
+    def scan_capture_cells(self, symbol):
+        """
+        capture_cells calculado desde cero con los bitboards (para comprobar el índice).
+        :return: Conjunto de tuplas (fila, columna).
+        """
+        own = self.bits[symbol]
+        opponent = self.bits["X" if symbol == "O" else "O"]
+        geometry = self.geometry
+        found = 0
+        # Con máscaras: vacía, par rival y ficha propia, hacia cada lado de cada dirección
+        for shift, forward, backward in zip(geometry.shifts, geometry.shift_masks, geometry.back_masks):
+            first = (opponent >> shift) & forward
+            second = (first >> shift) & forward
+            third = (((own >> shift) & forward) >> shift & forward) >> shift & forward
+            found |= first & second & third
+            first = (opponent << shift) & backward
+            second = (first << shift) & backward
+            third = (((own << shift) & backward) << shift & backward) << shift & backward
+            found |= first & second & third
+        found &= geometry.full & ~(own | opponent)
+        cells = set()
+        coords = geometry.coords
+        while found:
+            low = found & -found
+            cells.add(coords[low.bit_length() - 1])
+            found ^= low
+        return cells
+
+    def scan_capture_count(self, row, col, symbol):
+        """
+        capture_count calculado desde cero con los rayos de captura (para comprobar el índice).
+        :return: Número de pares capturables.
+        """
+        opponent_bits = self.bits["X" if symbol == "O" else "O"]
+        own_bits = self.bits[symbol]
+        pairs = 0
+        for pair, end, _, _ in self.geometry.capture_rays[row * self.size + col]:
+            if (opponent_bits & pair) == pair and own_bits & end:
+                pairs += 1
+        return pairs
+
     def check_and_execute_capture(self, row, col, symbol):
         """
         Verifica y ejecuta capturas si se encuentran pares del oponente flanqueados.
         :param row: Fila del movimiento.
         :param col: Columna del movimiento.
         :param symbol: Símbolo del jugador que realizó el movimiento.
+        :return: Lista de casillas (fila, columna) capturadas.
         """
-        directions = [(1, 0), (0, 1), (1, 1), (1, -1)]  # Vertical, horizontal, diagonales
         opponent_symbol = "X" if symbol == "O" else "O"
         saved = False
         couldbreak = False
+        captured = []
 
-        for dr, dc in directions:
-            # Posiciones a verificar hacia adelante
-            r1, c1 = row + dr, col + dc
-            r2, c2 = row + 2 * dr, col + 2 * dc
-            r3, c3 = row + 3 * dr, col + 3 * dc
-
-            if (
-                0 <= r1 < self.size
-                and 0 <= c1 < self.size
-                and 0 <= r2 < self.size
-                and 0 <= c2 < self.size
-                and 0 <= r3 < self.size
-                and 0 <= c3 < self.size
-                and self.grid[r1][c1] == opponent_symbol
-                and self.grid[r2][c2] == opponent_symbol
-                and self.grid[r3][c3] == symbol
-            ):
+        # Para cada dirección, hacia adelante y hacia atrás: par enemigo + ficha propia
+        for pair, end, (r1, c1), (r2, c2) in self.geometry.capture_rays[row * self.size + col]:
+            if (self.bits[opponent_symbol] & pair) == pair and self.bits[symbol] & end:
                 if self.has_alignment(opponent_symbol):
                     couldbreak = True
-                # Captura identificada hacia adelante
-                self.grid[r1][c1] = "."
-                self.grid[r2][c2] = "."
-                self.captures[symbol] += 2
+                # Captura identificada
+                self._remove(r1, c1)
+                self._remove(r2, c2)
+                captured.append((r1, c1))
+                captured.append((r2, c2))
+                self._set_captures(symbol, self.captures[symbol] + 2)
                 saved = True
 
-            # Posiciones a verificar hacia atrás
-            r1, c1 = row - dr, col - dc
-            r2, c2 = row - 2 * dr, col - 2 * dc
-            r3, c3 = row - 3 * dr, col - 3 * dc
-
-            if (
-                0 <= r1 < self.size
-                and 0 <= c1 < self.size
-                and 0 <= r2 < self.size
-                and 0 <= c2 < self.size
-                and 0 <= r3 < self.size
-                and 0 <= c3 < self.size
-                and self.grid[r1][c1] == opponent_symbol
-                and self.grid[r2][c2] == opponent_symbol
-                and self.grid[r3][c3] == symbol
-            ):
-                if self.has_alignment(opponent_symbol):
-                    couldbreak = True
-                # Captura identificada hacia atrás
-                self.grid[r1][c1] = "."
-                self.grid[r2][c2] = "."
-                self.captures[symbol] += 2
-                saved = True
-                
         if self.has_alignment(opponent_symbol) and couldbreak == True:
              self.acabose = opponent_symbol
         if saved == True and symbol == "X" and couldbreak == True:
@@ -376,6 +997,7 @@ class Board:
             self.towinx = "."
         if (saved == False and (self.towinx == opponent_symbol or self.towino == opponent_symbol)):
             self.acabose = opponent_symbol
+        return captured
 
 
     def is_game_over(self):
@@ -395,9 +1017,23 @@ class Board:
         # Comprobar si el tablero está lleno
         return self.is_draw()
 
+    def winner(self):
+        """
+        Devuelve el ganador según las comprobaciones con las que terminan los
+        bucles de juego (capturas y bandera acabose), sin modificar el tablero.
+        :return: 'X', 'O' o None si nadie ha ganado todavía.
+        """
+        if self.captures["X"] >= 10:
+            return "X"
+        if self.captures["O"] >= 10:
+            return "O"
+        if self.acabose != ".":
+            return self.acabose
+        return None
+
     def is_draw(self):
         """
         Comprueba si el tablero está lleno y no hay ganador.
         :return: True si el tablero está lleno y no hay ganador.
         """
-        return all(cell != "." for row in self.grid for cell in row)
+        return (self.bits["X"] | self.bits["O"]) == self.geometry.full
@@ -0,0 +1,145 @@
+# features.py
+
+import numpy as np
+
+from tactics import ThreatReport
+
+PAD = 6  # Margen: las ventanas más largas (treses abiertos) miran 5 casillas adelante
+DIRECTIONS = [(1, 0), (0, 1), (1, 1), (1, -1)]  # Vertical, horizontal, diagonales
+PLAYERS = ("X", "O")
+KINDS = ("wins", "fours", "open_threes", "captures", "capture_threats")
+
+
+def board_planes(board):
+    """
+    Convierte el tablero en planos 0/1 a partir de sus bitboards.
+    :return: Array uint8 (2, size, size): fichas de X y de O.
+    """
+    cells = board.size * board.size
+    nbytes = (cells + 7) // 8
+    planes = np.empty((2, board.size, board.size), dtype=np.uint8)
+    for index, symbol in enumerate(PLAYERS):
+        raw = np.frombuffer(board.bits[symbol].to_bytes(nbytes, "little"), dtype=np.uint8)
+        planes[index] = np.unpackbits(raw, bitorder="little")[:cells].reshape(board.size, board.size)
+    return planes
+
+
+_WINDOWS = {}
+
+
+def window_indices(size):
+    """
+    Índices, en el tablero con margen aplanado, de las 6 casillas de la ventana
+    que empieza en cada casilla en cada dirección (cacheados por tamaño).
+    :return: Tupla (índices (4, 6, size * size), destinos (2, 4, 6, size * size)):
+             los destinos son los mismos índices desplazados por jugador, para
+             repartir las marcas de ambos jugadores en un solo bincount.
+    """
+    windows = _WINDOWS.get(size)
+    if windows is None:
+        side = size + 2 * PAD
+        rows, cols = np.divmod(np.arange(size * size), size)
+        base = (rows + PAD) * side + cols + PAD
+        indices = np.empty((4, 6, size * size), dtype=np.intp)
+        for d, (dr, dc) in enumerate(DIRECTIONS):
+            for step in range(6):
+                indices[d, step] = base + step * (dr * side + dc)
+        targets = indices[None] + np.arange(2).reshape(2, 1, 1, 1) * side * side
+        windows = _WINDOWS[size] = (indices, targets)
+    return windows
+
+
+class FeatureMap:
+    def __init__(self, planes):
+        """
+        Análisis táctico vectorizado de todo el tablero para ambos jugadores a la vez.
+        Las ventanas de las cuatro direcciones se extraen de una vez con un array
+        de índices (ventanas con paso fijo sobre el tablero con margen aplanado),
+        y lo que aporta cada ventana se reparte a sus casillas con bincount.
+        Los campos son arrays (2, size, size) (índice 0 = X, 1 = O) con el número
+        de patrones que usan cada casilla, igual que ThreatReport: wins, fours,
+        open_threes, captures y capture_threats. window_counts es (2, 4, size, size):
+        fichas propias de la ventana de 5 que empieza en la casilla en cada
+        dirección, o -1 si tiene fichas rivales o se sale del tablero.
+        :param planes: Array (2, size, size) de board_planes.
+        """
+        size = planes.shape[-1]
+        side = size + 2 * PAD
+        self.size = size
+        padded = np.zeros((2, side, side), dtype=np.int8)
+        padded[:, PAD:PAD + size, PAD:PAD + size] = planes
+        empty_board = np.zeros((side, side), dtype=np.int8)
+        empty_board[PAD:PAD + size, PAD:PAD + size] = 1 - planes[0] - planes[1]
+        indices, targets = window_indices(size)
+        own = np.take(padded.reshape(2, -1), indices, axis=1)  # (2, 4, 6, casillas)
+        rival = own[::-1]
+        empty = np.take(empty_board.reshape(-1), indices)  # (4, 6, casillas)
+        # Ventanas de 5: cuatro propias y un hueco ganan; tres propias, cuatro
+        own5 = own[:, :, :5].sum(axis=2)
+        free = own5 + empty[:, :5].sum(axis=1) == 5
+        self.window_counts = np.where(free, own5, -1).astype(np.int8).reshape(2, 4, size, size)
+        holes = empty[:, :5].astype(bool)
+        wins = (free & (own5 == 4))[:, :, None] & holes
+        fours = (free & (own5 == 3))[:, :, None] & holes
+        # Tres abierto: hueco, cuatro casillas con dos propias y dos vacías, hueco
+        ends = (empty[:, 0] & empty[:, 5]).astype(bool)
+        three = ends & (own[:, :, 1:5].sum(axis=2) == 2) & (empty[:, 1:5].sum(axis=1) == 2)
+        threes = three[:, :, None] & empty[:, 1:5].astype(bool)
+        # Capturas (".TTM" y "MTT.") y amenazas de captura (".TT.")
+        pair = (rival[:, :, 1] & rival[:, :, 2]).astype(bool)
+        before = pair & (empty[:, 0] & own[:, :, 3]).astype(bool)
+        after = pair & (own[:, :, 0] & empty[:, 3]).astype(bool)
+        threat = pair & (empty[:, 0] & empty[:, 3]).astype(bool)
+        self.wins = self._spread(wins, targets[:, :, :5])
+        self.fours = self._spread(fours, targets[:, :, :5])
+        self.open_threes = self._spread(threes, targets[:, :, 1:5])
+        pair_ends = targets[:, :, 0:4:3]  # Casillas 0 y 3 de la ventana
+        self.captures = self._spread(np.stack([before, after], axis=2), pair_ends)
+        self.capture_threats = self._spread(np.stack([threat, threat], axis=2), pair_ends)
+
+    def _spread(self, marks, targets):
+        """
+        Suma las marcas de cada ventana en las casillas que señalan.
+        :param marks: Array booleano (2, 4, pasos, casillas).
+        :param targets: Destinos (2, 4, pasos, casillas) de window_indices.
+        :return: Array (2, size, size) de recuentos.
+        """
+        side = self.size + 2 * PAD
+        counts = np.bincount(targets[marks], minlength=2 * side * side).reshape(2, side, side)
+        return counts[:, PAD:PAD + self.size, PAD:PAD + self.size]
+
+    @classmethod
+    def from_board(cls, board):
+        """Analiza una instancia de Board."""
+        return cls(board_planes(board))
+
+    def cells(self, kind, symbol):
+        """
+        Casillas de un apartado para un jugador, como en ThreatReport.
+        :param kind: Uno de KINDS.
+        :return: Diccionario casilla (fila, columna) -> número de patrones.
+        """
+        counts = getattr(self, kind)[PLAYERS.index(symbol)]
+        rows, cols = np.nonzero(counts)
+        return {(int(r), int(c)): int(counts[r, c]) for r, c in zip(rows, cols)}
+
+    def report(self):
+        """
+        El mismo informe que tactics.scan_threats.
+        :return: ThreatReport.
+        """
+        report = ThreatReport()
+        for kind in KINDS:
+            field = getattr(report, kind)
+            for symbol in PLAYERS:
+                field[symbol] = self.cells(kind, symbol)
+        return report
+
+
+def scan_features(board):
+    """
+    Análisis vectorizado equivalente a tactics.scan_threats.
+    :param board: Instancia del tablero (clase Board).
+    :return: ThreatReport.
+    """
+    return FeatureMap.from_board(board).report()
@@ -0,0 +1,151 @@
+# linepatterns.py
+
+import os
+
+# Segmento de 9 casillas de una línea centrado en la casilla a jugar, visto
+# desde el jugador que mueve: 2 bits por casilla, la de índice k en los bits 2k.
+EMPTY = 0
+OWN = 1
+RIVAL = 2
+BORDER = 3
+SEGMENT = 9
+CENTER = 4
+SEGMENT_MASK = (1 << (2 * SEGMENT)) - 1
+
+# Clases de patrón (bits) que forma una ficha propia colocada en el centro
+FIVE = 1  # Cinco o más seguidas
+OPEN_FOUR = 2  # .MMMM.
+FOUR = 4  # Alguna ventana de 5 con cuatro propias y un hueco (amenaza de cinco)
+OPEN_THREE = 8  # .MMM.
+BROKEN_THREE = 16  # .M.MM. o .MM.M.
+DOUBLE_THREE = 32  # Cuenta como tres para la regla del doble tres (introduces_double_threes)
+CAPTURE = 64  # Captura un par rival (centro, rival, rival, propia)
+CAPTURE_THREAT = 128  # Amenaza capturar un par rival (centro, rival, rival, vacía)
+
+TABLE_VERSION = 1
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "linepatterns.cache")
+_HEADER = b"GOMOKU-LINES-%d\n" % TABLE_VERSION
+
+
+def classify(cells):
+    """
+    Clases de patrón de un segmento tras colocar una ficha propia en el centro.
+    :param cells: Secuencia de 9 valores (EMPTY, OWN, RIVAL o BORDER) con el centro vacío.
+    :return: Combinación de bits de clase.
+    """
+    cells = list(cells)
+    cells[CENTER] = OWN
+    flags = 0
+    # Racha de fichas propias que pasa por el centro
+    left = CENTER
+    while left > 0 and cells[left - 1] == OWN:
+        left -= 1
+    right = CENTER
+    while right < SEGMENT - 1 and cells[right + 1] == OWN:
+        right += 1
+    run = right - left + 1
+    before = cells[left - 1] if left > 0 else BORDER
+    after = cells[right + 1] if right < SEGMENT - 1 else BORDER
+    if run >= 5:
+        flags |= FIVE
+    if run == 4 and before == EMPTY and after == EMPTY:
+        flags |= OPEN_FOUR
+    if not flags & FIVE:
+        for start in range(CENTER - 4, CENTER + 1):
+            window = cells[start:start + 5]
+            if window.count(OWN) == 4 and window.count(EMPTY) == 1:
+                flags |= FOUR
+                break
+    # Treses abiertos (.MMM., .M.MM., .MM.M.): la forma debe incluir el centro
+    text = "".join(".MT|"[value] for value in cells)
+    for shape, flag in ((".MMM.", OPEN_THREE), (".M.MM.", BROKEN_THREE), (".MM.M.", BROKEN_THREE)):
+        start = text.find(shape)
+        while start != -1:
+            if start <= CENTER < start + len(shape):
+                flags |= flag
+            start = text.find(shape, start + 1)
+    # Recuento de Board.introduces_double_threes: propias seguidas y extremos vacíos
+    count = 1
+    open_ends = 0
+    for sign in (1, -1):
+        for step in range(1, 5):
+            value = cells[CENTER + sign * step]
+            if value == OWN:
+                count += 1
+            elif value == EMPTY:
+                open_ends += 1
+                break
+            else:
+                break
+    if count == 3 and open_ends == 2:
+        flags |= DOUBLE_THREE
+    # Capturas hacia cada lado
+    for sign in (1, -1):
+        first = cells[CENTER + sign]
+        second = cells[CENTER + 2 * sign]
+        third = cells[CENTER + 3 * sign]
+        if first == RIVAL and second == RIVAL:
+            if third == OWN:
+                flags |= CAPTURE
+            elif third == EMPTY:
+                flags |= CAPTURE_THREAT
+    return flags
+
+
+def build_table():
+    """
+    Calcula la clase de todos los segmentos posibles (los de centro ocupado valen 0).
+    :return: bytes de 4 ** 9 entradas indexadas por el código del segmento.
+    """
+    table = bytearray(1 << (2 * SEGMENT))
+    cells = [EMPTY] * SEGMENT
+    sides = [k for k in range(SEGMENT) if k != CENTER]
+    for code in range(1 << (2 * (SEGMENT - 1))):
+        full = 0
+        for position, k in enumerate(sides):
+            value = (code >> (2 * position)) & 3
+            cells[k] = value
+            full |= value << (2 * k)
+        table[full] = classify(cells)
+    return bytes(table)
+
+
+def load_table(path=CACHE_FILE):
+    """
+    Lee la tabla de la caché en disco o la construye y la guarda.
+    Si el archivo no se puede escribir, la tabla se usa solo en memoria.
+    :return: bytes de la tabla.
+    """
+    size = 1 << (2 * SEGMENT)
+    try:
+        with open(path, "rb") as cache:
+            data = cache.read()
+        if data.startswith(_HEADER) and len(data) == len(_HEADER) + size:
+            return data[len(_HEADER):]
+    except OSError:
+        pass
+    table = build_table()
+    try:
+        with open(path, "wb") as cache:
+            cache.write(_HEADER + table)
+    except OSError:
+        pass
+    return table
+
+
+TABLE = load_table()
+
+
+def line_code(values):
+    """
+    Código de una línea completa con 4 casillas de borde a cada lado.
+    :param values: Valores (EMPTY, OWN, RIVAL) de las casillas de la línea.
+    :return: Entero con 2 bits por casilla; la casilla i de la línea queda en los bits 2 * (i + 4).
+    """
+    code = 0
+    for k in range(4):
+        code |= BORDER << (2 * k)
+        code |= BORDER << (2 * (len(values) + 4 + k))
+    for i, value in enumerate(values):
+        code |= value << (2 * (i + 4))
+    return code
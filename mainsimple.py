@@ -3,6 +3,7 @@
 from board import Board
 from player import Player
 from ai import AIPlayer
+from profiling import environment_profiler
 
 
 def main():
@@ -33,6 +34,11 @@ def main():
     else:
         player2 = Player("Jugador 2", "O")
 
+    # Perfilado opcional de la partida (variable de entorno GOMOKU_PROFILE)
+    profiler = environment_profiler()
+    if profiler is not None:
+        profiler.start_game()
+
     # Bucle principal del juego
     board.display()
     current_player = player1
@@ -68,6 +74,10 @@ def main():
     elif board.acabose != ".":
         print("Gana jugador de " + board.acabose)
 
+    if profiler is not None:
+        print(profiler.end_game())
+        print("Perfiles guardados en " + profiler.directory)
+
 
 if __name__ == "__main__":
     main()
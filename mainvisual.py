@@ -2,6 +2,7 @@ import pygame
 from board import Board
 from player import Player
 from ai import AIPlayer
+from profiling import environment_profiler
 
 # Constantes de Pygame
 WINDOW_SIZE = 800
@@ -190,6 +191,12 @@ class GomokuPygame:
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     self.mode = self.handle_menu_click(event.pos, button_1, button_2)
 
+        # Perfilado opcional de la partida (GOMOKU_PROFILE); las salidas con
+        # exit() lo cierran con atexit
+        profiler = environment_profiler()
+        if profiler is not None:
+            profiler.start_game()
+
         # Bucle principal del juego
         running = True
         while running:
@@ -217,6 +224,8 @@ class GomokuPygame:
             pygame.display.flip()
             self.clock.tick(30)
 
+        if profiler is not None:
+            profiler.end_game()
         pygame.quit()
 
 
@@ -0,0 +1,259 @@
+# mcts.py
+
+import math
+import random
+import time
+from array import array
+
+NO_MOVE = -1
+EXPLORATION = 1.4  # Constante de exploración de UCT
+PLAYOUT_DEPTH = 24  # Movimientos máximos de una simulación antes de evaluar
+
+
+class MCTSSearch:
+    def __init__(self, max_nodes=200000, exploration=EXPLORATION, playout_depth=PLAYOUT_DEPTH, seed=None):
+        """
+        Búsqueda de Monte Carlo en árbol con selección UCT. Los nodos viven en
+        arrays paralelos (visitas, valor, padre, primer hijo, número de hijos y
+        movimiento); los hijos de un nodo ocupan posiciones consecutivas.
+        :param max_nodes: Capacidad del almacén de nodos (al llenarse se deja de expandir).
+        :param exploration: Constante de exploración de UCT.
+        :param playout_depth: Movimientos máximos de cada simulación.
+        :param seed: Semilla del generador de las simulaciones (None = aleatoria).
+        """
+        self.max_nodes = max_nodes
+        self.exploration = exploration
+        self.playout_depth = playout_depth
+        self.random = random.Random(seed)
+        self.reset()
+        self.playouts = 0
+        self.reused = 0
+
+    def reset(self):
+        """Vacía el árbol dejando solo una raíz sin expandir."""
+        self.visits = array("l", [0])
+        self.value = array("d", [0.0])  # Recompensa acumulada del jugador que llegó al nodo
+        self.parent = array("l", [-1])
+        self.first_child = array("l", [-1])
+        self.child_count = array("l", [0])
+        self.move = array("l", [NO_MOVE])
+        self.history = None  # Movimientos de la partida cuando se construyó la raíz
+
+    def __len__(self):
+        return len(self.visits)
+
+    def _add(self, parent, move):
+        """Añade un nodo al final del almacén y devuelve su índice."""
+        self.visits.append(0)
+        self.value.append(0.0)
+        self.parent.append(parent)
+        self.first_child.append(-1)
+        self.child_count.append(0)
+        self.move.append(move)
+        return len(self.visits) - 1
+
+    def reroot(self, board):
+        """
+        Reutiliza el árbol de la búsqueda anterior: baja por los movimientos
+        jugados desde entonces (el nuestro y la respuesta del rival) y compacta
+        ese subárbol al principio del almacén. Si no es posible, empieza de cero.
+        """
+        played = [record[0] for record, _ in board.move_stack]
+        if self.history is None or played[:len(self.history)] != self.history:
+            self.reset()
+            return
+        node = 0
+        for row, col in played[len(self.history):]:
+            index = row * board.size + col
+            child = -1
+            first = self.first_child[node]
+            for candidate in range(first, first + self.child_count[node]):
+                if self.move[candidate] == index:
+                    child = candidate
+                    break
+            if child < 0:
+                self.reset()
+                return
+            node = child
+        if node == 0:
+            return
+        # Copia en anchura del subárbol: los hermanos siguen siendo consecutivos
+        visits, value, first_child, child_count, move = (
+            self.visits, self.value, self.first_child, self.child_count, self.move,
+        )
+        self.visits = array("l", [visits[node]])
+        self.value = array("d", [value[node]])
+        self.parent = array("l", [-1])
+        self.first_child = array("l", [-1])
+        self.child_count = array("l", [0])
+        self.move = array("l", [NO_MOVE])
+        queue = [(node, 0)]
+        for old, new in queue:
+            count = child_count[old]
+            if not count:
+                continue
+            self.first_child[new] = len(self.visits)
+            self.child_count[new] = count
+            first = first_child[old]
+            for old_child in range(first, first + count):
+                new_child = self._add(new, move[old_child])
+                self.visits[new_child] = visits[old_child]
+                self.value[new_child] = value[old_child]
+                queue.append((old_child, new_child))
+        self.reused = self.visits[0]
+
+    def expand(self, board, node, symbol):
+        """
+        Crea los hijos de un nodo con los movimientos válidos cercanos a las
+        fichas. Si no caben en el almacén, el nodo queda como hoja.
+        """
+        size = board.size
+        forbidden = board.forbidden(symbol)  # Prohibidas por doble tres, de una vez
+        moves = [row * size + col for row, col in board.candidate_moves() if not forbidden >> (row * size + col) & 1]
+        if not moves or len(self.visits) + len(moves) > self.max_nodes:
+            return
+        self.first_child[node] = len(self.visits)
+        self.child_count[node] = len(moves)
+        for index in moves:
+            self._add(node, index)
+
+    def select(self, node):
+        """
+        Hijo con mayor UCT (los no visitados primero).
+        :return: Índice del hijo.
+        """
+        visits = self.visits
+        value = self.value
+        first = self.first_child[node]
+        log_parent = math.log(visits[node] or 1)
+        best, best_score = first, -1.0
+        for child in range(first, first + self.child_count[node]):
+            count = visits[child]
+            if not count:
+                return child
+            score = value[child] / count + self.exploration * math.sqrt(log_parent / count)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+    def playout(self, board, symbol):
+        """
+        Simulación desde la posición actual con movimientos aleatorios cercanos
+        a las fichas; solo se fuerza ganar o tapar un cinco.
+        :param symbol: Jugador que mueve.
+        :return: Ganador ('X' u 'O') o None si no se decide.
+        """
+        rng = self.random
+        played = 0
+        winner = board.winner()
+        while winner is None and played < self.playout_depth:
+            opponent = "X" if symbol == "O" else "O"
+            forced = board.five_cells(symbol) or board.five_cells(opponent)
+            cells = tuple(forced) if forced else tuple(board.candidates)
+            if not cells:
+                break
+            move = rng.choice(cells)
+            if not board.push(move, symbol):
+                # Prohibido por doble tres: se prueba otra vez sin contar la jugada
+                forbidden = board.forbidden(symbol)
+                cells = [(row, col) for row, col in cells if not forbidden >> (row * board.size + col) & 1]
+                if not cells or not board.push(rng.choice(cells), symbol):
+                    break
+            played += 1
+            board.check_winner(symbol)
+            winner = board.winner()
+            symbol = opponent
+        if winner is None:
+            # Sin final: gana quien tenga mejor evaluación por patrones
+            score = board.pattern_score("X") - board.pattern_score("O")
+            if score:
+                winner = "X" if score > 0 else "O"
+        for _ in range(played):
+            board.pop()
+        return winner
+
+    def search(self, board, symbol, time_limit=None, playouts=None):
+        """
+        Ejecuta iteraciones de selección, expansión, simulación y propagación
+        hasta agotar el tiempo o las simulaciones.
+        :param board: Instancia del tablero (clase Board); queda como estaba.
+        :param symbol: Jugador que mueve.
+        :param time_limit: Segundos disponibles (None = sin límite de tiempo).
+        :param playouts: Simulaciones máximas (None = sin límite; con ambos a None, 1000).
+        :return: Movimiento (fila, columna) más visitado de la raíz, o None.
+        """
+        if time_limit is None and playouts is None:
+            playouts = 1000
+        self.reused = 0
+        self.reroot(board)
+        deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        root_depth = len(board.move_stack)
+        self.playouts = 0
+        while playouts is None or self.playouts < playouts:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            # Selección: se baja por UCT hasta una hoja o un final de partida
+            node = 0
+            to_move = symbol
+            winner = board.winner()
+            while self.child_count[node] and winner is None:
+                node = self.select(node)
+                board.push(divmod(self.move[node], board.size), to_move)
+                board.check_winner(to_move)
+                winner = board.winner()
+                to_move = "X" if to_move == "O" else "O"
+            # Expansión de la hoja si ya tiene visitas
+            if winner is None and self.visits[node] and not self.child_count[node]:
+                self.expand(board, node, to_move)
+                if self.child_count[node]:
+                    node = self.select(node)
+                    board.push(divmod(self.move[node], board.size), to_move)
+                    board.check_winner(to_move)
+                    winner = board.winner()
+                    to_move = "X" if to_move == "O" else "O"
+            if winner is None:
+                winner = self.playout(board, to_move)
+            self.playouts += 1
+            while len(board.move_stack) > root_depth:
+                board.pop()
+            # Propagación: cada nodo suma la recompensa del jugador que movió hasta él
+            mover = "X" if to_move == "O" else "O"
+            while node >= 0:
+                self.visits[node] += 1
+                if winner == mover:
+                    self.value[node] += 1.0
+                elif winner is None:
+                    self.value[node] += 0.5
+                node = self.parent[node]
+                mover = "X" if mover == "O" else "O"
+        if not self.child_count[0]:
+            self.expand(board, 0, symbol)
+        best = self.best_child(0)
+        if best < 0:
+            return None
+        move = divmod(self.move[best], board.size)
+        self.history = [record[0] for record, _ in board.move_stack]
+        return move
+
+    def best_child(self, node):
+        """Hijo más visitado (en empate, el de mejor media), o -1 si no tiene."""
+        first = self.first_child[node]
+        best, best_key = -1, None
+        for child in range(first, first + self.child_count[node]):
+            count = self.visits[child]
+            key = (count, self.value[child] / count if count else 0.0)
+            if best_key is None or key > best_key:
+                best, best_key = child, key
+        return best
+
+    def stats(self):
+        """
+        Datos de la última búsqueda.
+        :return: Diccionario con nodos, simulaciones, visitas reutilizadas y de la raíz.
+        """
+        return {
+            "nodes": len(self.visits),
+            "playouts": self.playouts,
+            "reused_visits": self.reused,
+            "root_visits": self.visits[0],
+        }
@@ -0,0 +1,215 @@
+# parallel.py
+
+import argparse
+import multiprocessing
+import time
+
+from ai import AIPlayer, MAX_DEPTH
+from board import Board
+from positions import POSITIONS, load_position
+from transposition import SharedTranspositionTable
+
+# IA de cada proceso de trabajo, reutilizada entre llamadas (conserva su tabla)
+_WORKER_PLAYERS = {}
+
+
+def _worker_player(symbol, evaluator, max_depth, tt_entries, shared_name, stats=False):
+    """
+    Devuelve la IA del proceso actual para una configuración, creándola si hace falta.
+    Con shared_name, la IA usa la tabla compartida de ese nombre en lugar de una propia.
+    Con stats, la IA cuenta también las hojas evaluadas y su tiempo.
+    """
+    key = (symbol, evaluator, max_depth, tt_entries, shared_name, stats)
+    player = _WORKER_PLAYERS.get(key)
+    if player is None:
+        table = None
+        if shared_name is not None:
+            table = SharedTranspositionTable.attach(shared_name, tt_entries)
+        player = AIPlayer(
+            "worker", symbol, tt_entries=tt_entries, max_depth=max_depth, evaluator=evaluator, tt=table,
+            stats=stats,
+        )
+        _WORKER_PLAYERS[key] = player
+    return player
+
+
+def _clear_worker_players():
+    """
+    Vacía la caché de IA del proceso, soltando antes las tablas compartidas a
+    las que se unieron (la del propietario la libera quien la creó).
+    """
+    for player in _WORKER_PLAYERS.values():
+        if isinstance(player.tt, SharedTranspositionTable) and not player.tt.owner:
+            player.tt.close()
+    _WORKER_PLAYERS.clear()
+
+
+def search_subset(task):
+    """
+    Trabajo de un proceso: profundización iterativa sobre un subconjunto de la raíz.
+    :param task: Tupla (instantánea binaria de Board.to_bytes, símbolo, movimientos,
+                 límite de tiempo, evaluador, profundidad máxima, entradas de la tabla,
+                 nombre de la tabla compartida, estadísticas).
+    :return: Tupla (iteraciones completadas, contadores de AIPlayer.counters).
+    """
+    snapshot, symbol, moves, time_limit, evaluator, max_depth, tt_entries, shared_name, stats = task
+    board = Board.from_bytes(snapshot)
+    player = _worker_player(symbol, evaluator, max_depth, tt_entries, shared_name, stats)
+    player.tt.new_search()
+    player.search(board, time_limit, root_moves=moves)
+    return player.iterations, player.counters()
+
+
+class ParallelSearch:
+    def __init__(self, workers=None, evaluator="patterns", max_depth=MAX_DEPTH, tt_entries=1 << 18,
+                 shared_tt=False, stats=False):
+        """
+        Búsqueda con la raíz repartida entre procesos.
+        :param workers: Número de procesos (None = todos los núcleos; 1 = en este proceso).
+        :param evaluator: Evaluador de las IA de los procesos.
+        :param max_depth: Profundidad máxima de cada proceso.
+        :param tt_entries: Tamaño de la tabla de transposiciones (de cada proceso, o la compartida).
+        :param shared_tt: Si es True, todos los procesos usan una SharedTranspositionTable.
+        :param stats: Si es True, los procesos cuentan también las hojas evaluadas.
+        """
+        self.workers = workers or multiprocessing.cpu_count()
+        self.evaluator = evaluator
+        self.max_depth = max_depth
+        self.tt_entries = tt_entries
+        self.stats = stats
+        self.worker_counters = []  # Contadores de cada proceso en la última búsqueda
+        self.pool = None
+        self.shared_table = None
+        if shared_tt:
+            self.shared_table = SharedTranspositionTable(entries=tt_entries)
+
+    def close(self):
+        """Cierra el conjunto de procesos y libera la tabla compartida."""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+        if self.shared_table is not None:
+            self.shared_table.close()
+            self.shared_table = None
+
+    def search(self, board, symbol, time_limit=None, root_moves=None):
+        """
+        Busca el mejor movimiento repartiendo los movimientos de la raíz por turnos
+        entre los procesos, y se queda con la mejor puntuación a la mayor profundidad
+        que todos han completado.
+        :param board: Instancia del tablero (clase Board).
+        :param symbol: Jugador que mueve.
+        :param time_limit: Segundos disponibles (None = hasta max_depth).
+        :param root_moves: Movimientos de la raíz ya ordenados (None = candidatos del tablero).
+        :return: Tupla (puntuación, movimiento, profundidad, nodos totales).
+        """
+        if root_moves is None:
+            root_moves = board.candidate_moves()
+        snapshot = board.to_bytes()  # Unos 100 bytes por tarea
+        shared_name = None
+        if self.shared_table is not None:
+            self.shared_table.new_search()
+            shared_name = self.shared_table.name
+        parts = [root_moves[i::self.workers] for i in range(self.workers)]
+        tasks = [
+            (snapshot, symbol, part, time_limit, self.evaluator, self.max_depth, self.tt_entries, shared_name,
+             self.stats)
+            for part in parts
+            if part
+        ]
+        if self.workers == 1:
+            results = [search_subset(task) for task in tasks]  # Alternativa determinista
+        else:
+            if self.pool is None:
+                self.pool = multiprocessing.Pool(self.workers)
+            results = self.pool.map(search_subset, tasks)
+
+        self.worker_counters = [counters for _, counters in results]
+        nodes = sum(counters["nodes"] for counters in self.worker_counters)
+        completed = [iterations for iterations, _ in results if iterations]
+        if not completed:
+            return None, None, 0, nodes
+        depth = min(iterations[-1][0] for iterations in completed)
+        best_score, best_move = None, None
+        for iterations in completed:
+            for it_depth, score, move, _ in iterations:
+                if it_depth == depth and (best_score is None or score > best_score):
+                    best_score, best_move = score, move
+        return best_score, best_move, depth, nodes
+
+
+def benchmark(worker_counts, depth, names=None, shared_modes=(False,)):
+    """
+    Compara la búsqueda en serie con la paralela a profundidad fija.
+    :param worker_counts: Números de procesos a probar.
+    :param depth: Profundidad de búsqueda.
+    :param names: Posiciones de positions.py (por defecto, todas).
+    :param shared_modes: Variantes a medir: tablas por proceso (False) y/o compartida (True).
+    :return: Lista de diccionarios con tiempos, nodos, nodos/s, aceleración y, en
+             las filas con tabla compartida, la reducción de nodos frente a la
+             fila con tablas por proceso del mismo número de procesos.
+    """
+    rows = []
+    for name in names or list(POSITIONS):
+        board = load_position(name)
+        serial = AIPlayer("serial", board.turn, max_depth=depth)
+        start = time.perf_counter()
+        serial.search(board)
+        serial_time = time.perf_counter() - start
+        rows.append({
+            "position": name, "workers": "serial", "shared": False, "seconds": serial_time,
+            "nodes": serial.nodes, "nps": serial.nodes / serial_time, "speedup": 1.0,
+            "node_reduction": None,
+        })
+        for workers in worker_counts:
+            own_nodes = None
+            for shared in shared_modes:
+                _clear_worker_players()  # Sin tablas calientes de la medida anterior
+                searcher = ParallelSearch(workers, max_depth=depth, shared_tt=shared)
+                if workers > 1:
+                    searcher.pool = multiprocessing.Pool(workers)  # Arranque fuera de la medida
+                start = time.perf_counter()
+                _, _, _, nodes = searcher.search(board, board.turn)
+                elapsed = time.perf_counter() - start
+                searcher.close()
+                reduction = None
+                if not shared:
+                    own_nodes = nodes
+                elif own_nodes:
+                    reduction = 1.0 - nodes / own_nodes
+                rows.append({
+                    "position": name, "workers": workers, "shared": shared, "seconds": elapsed,
+                    "nodes": nodes, "nps": nodes / elapsed, "speedup": serial_time / elapsed,
+                    "node_reduction": reduction,
+                })
+    _clear_worker_players()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aceleración de la búsqueda paralela de la raíz")
+    parser.add_argument("--workers", default="1,2,4", help="Procesos a probar, separados por comas")
+    parser.add_argument("--depth", type=int, default=4,
+                        help="Profundidad fija de búsqueda (desde 4 se nota la tabla compartida)")
+    parser.add_argument("--shared-tt", action="store_true",
+                        help="Medir también con la tabla de transposiciones compartida")
+    args = parser.parse_args()
+    worker_counts = [int(count) for count in args.workers.split(",")]
+    shared_modes = (False, True) if args.shared_tt else (False,)
+    print(f"Núcleos disponibles: {multiprocessing.cpu_count()}")
+    print(
+        f"{'posición':<10} {'procesos':>8} {'tabla':>9} {'segundos':>9} {'nodos':>8} {'nodos/s':>9} "
+        f"{'acel.':>6} {'-nodos':>7}"
+    )
+    for row in benchmark(worker_counts, args.depth, shared_modes=shared_modes):
+        table = "compart." if row["shared"] else "propia"
+        reduction = f"{row['node_reduction']:>7.1%}" if row["node_reduction"] is not None else f"{'':>7}"
+        print(
+            f"{row['position']:<10} {str(row['workers']):>8} {table:>9} {row['seconds']:>9.3f} "
+            f"{row['nodes']:>8} {row['nps']:>9.0f} {row['speedup']:>6.2f} {reduction}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# patterns.py
+
+# Puntuación de los patrones de una línea desde el punto de vista de un jugador.
+# En las cadenas, "M" es una ficha propia, "T" una del rival y "." una casilla vacía.
+
+FIVE = 100000
+OPEN_FOUR = 20000
+FOUR = 2500
+OPEN_THREE = 2000
+CLOSED_THREE = 300
+OPEN_TWO = 150
+CLOSED_TWO = 20
+CAPTURE_THREAT = 400  # Par rival que podemos capturar en la siguiente jugada
+CAPTURE_RISK = -350  # Par propio que el rival puede capturar
+
+# Patrones de alineación: el borde del tablero cuenta como ficha rival
+ALIGNMENT_PATTERNS = [
+    ("MMMMM", FIVE),
+    (".MMMM.", OPEN_FOUR),
+    ("TMMMM.", FOUR),
+    (".MMMMT", FOUR),
+    ("M.MMM", FOUR),
+    ("MMM.M", FOUR),
+    ("MM.MM", FOUR),
+    (".MMM.", OPEN_THREE),
+    (".M.MM.", OPEN_THREE),
+    (".MM.M.", OPEN_THREE),
+    ("TMMM.", CLOSED_THREE),
+    (".MMMT", CLOSED_THREE),
+    (".MM.", OPEN_TWO),
+    (".M.M.", OPEN_TWO),
+    ("TMM.", CLOSED_TWO),
+    (".MMT", CLOSED_TWO),
+]
+
+# Los pares capturables (CAPTURE_THREAT y CAPTURE_RISK) no se buscan en las
+# líneas: Board.pattern_score los cuenta con su índice de capturas
+
+# Valor acumulado de las capturas: se dispara al acercarse a las 10 (victoria)
+CAPTURE_VALUES = [0, 0, 300, 300, 800, 800, 2000, 2000, 6000, 6000, 50000]
+
+_TABLES = {
+    "X": str.maketrans({"X": "M", "O": "T", "|": "T"}),
+    "O": str.maketrans({"O": "M", "X": "T", "|": "T"}),
+}
+
+
+def score_line(line, symbol):
+    """
+    Puntúa las alineaciones de una línea del tablero para un jugador.
+    :param line: Cadena con el contenido de la línea ('X', 'O', '.') rodeada de '|'.
+    :param symbol: Jugador para el que se puntúa ('X' o 'O').
+    :return: Suma de los pesos de los patrones encontrados.
+    """
+    if symbol not in line:
+        return 0
+    blocked = line.translate(_TABLES[symbol])
+    score = 0
+    for pattern, weight in ALIGNMENT_PATTERNS:
+        if pattern in blocked:
+            score += weight * blocked.count(pattern)
+    return score
+
+
+def capture_value(count):
+    """
+    Valor de haber capturado count fichas.
+    :param count: Fichas capturadas por un jugador.
+    """
+    return CAPTURE_VALUES[min(count, len(CAPTURE_VALUES) - 1)]
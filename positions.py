@@ -0,0 +1,46 @@
+# positions.py
+
+from board import Board
+
+# Posiciones de referencia para pruebas de rendimiento: secuencias de movimientos
+# alternos empezando por 'X', todas jugables con Board.make_move.
+POSITIONS = {
+    "opening": [(9, 9), (9, 11), (7, 9), (8, 7), (9, 10), (9, 8), (8, 11), (11, 11)],
+    "midgame": [
+        (9, 9), (10, 11), (7, 11), (8, 7), (6, 7), (12, 11), (11, 10), (12, 8), (10, 7), (7, 9),
+        (5, 12), (10, 12), (8, 14), (9, 5), (10, 10), (12, 12), (12, 14), (11, 12), (13, 7), (6, 8),
+        (11, 4), (4, 7), (11, 9), (12, 9), (14, 14), (8, 4), (12, 10), (13, 14), (10, 6), (7, 14),
+    ],
+    "captures": [
+        (9, 9), (9, 8), (10, 8), (7, 7), (7, 10), (9, 7), (7, 11), (8, 11), (7, 5), (11, 5),
+        (10, 4), (5, 5), (6, 4), (10, 9), (11, 10), (8, 8), (8, 10), (5, 4), (12, 8), (13, 8),
+        (11, 9), (13, 4), (10, 6), (11, 4), (6, 13), (13, 12), (6, 9), (6, 7), (6, 6), (12, 10),
+        (6, 14), (13, 5), (7, 4), (13, 9), (11, 13), (14, 14), (14, 11), (8, 4), (8, 7), (9, 6),
+    ],
+    "endgame": [
+        (9, 9), (7, 10), (10, 9), (9, 7), (7, 11), (7, 5), (11, 11), (11, 10), (7, 4), (10, 13),
+        (8, 7), (10, 6), (13, 8), (6, 5), (8, 8), (10, 12), (12, 12), (14, 6), (14, 5), (6, 8),
+        (14, 12), (9, 14), (8, 4), (9, 11), (12, 10), (9, 4), (11, 4), (10, 7), (4, 4), (11, 7),
+        (12, 13), (8, 10), (11, 12), (9, 13), (10, 11), (5, 13), (8, 14), (13, 9), (5, 11), (13, 13),
+        (6, 10), (12, 8), (5, 5), (14, 10), (11, 5), (11, 14), (9, 6), (14, 8), (6, 11), (4, 6),
+        (11, 9), (10, 12), (8, 11), (7, 14), (5, 4), (9, 12), (7, 7), (13, 4), (8, 13), (12, 14),
+        (8, 9), (12, 11), (5, 6), (14, 14), (13, 12), (9, 8), (9, 7), (6, 9), (7, 6), (6, 12),
+    ],
+}
+
+
+def load_position(name, size=19):
+    """
+    Construye el tablero de una posición de referencia.
+    :param name: Clave de POSITIONS.
+    :param size: Lado del tablero.
+    :return: Instancia de Board con el turno del jugador que debe mover.
+    """
+    board = Board(size)
+    symbol = "X"
+    for move in POSITIONS[name]:
+        if not board.make_move(move, symbol):
+            raise ValueError(f"Movimiento inválido {move} en la posición {name}")
+        symbol = "O" if symbol == "X" else "X"
+    board.firstmove = "."
+    return board
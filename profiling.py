@@ -0,0 +1,230 @@
+# profiling.py
+
+import atexit
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+
+MODES = ("moves", "sample")
+DEFAULT_DIRECTORY = "profiles"
+SAMPLE_INTERVAL = 0.005  # Segundos entre muestras de la pila
+TARGET_FILES = ("board.py", "ai.py")  # Módulos del resumen de funciones más costosas
+TOP_FUNCTIONS = 20
+
+# Variables de entorno: GOMOKU_PROFILE=moves|sample activa el perfilado,
+# GOMOKU_PROFILE_DIR cambia la carpeta y GOMOKU_PROFILE_INTERVAL el intervalo de muestreo
+ENV_MODE = "GOMOKU_PROFILE"
+ENV_DIRECTORY = "GOMOKU_PROFILE_DIR"
+ENV_INTERVAL = "GOMOKU_PROFILE_INTERVAL"
+
+
+class StackSampler:
+    def __init__(self, interval=SAMPLE_INTERVAL, thread_id=None):
+        """
+        Muestreador de pilas en un hilo aparte: cada interval segundos anota la
+        pila del hilo observado. Cuesta mucho menos que cProfile y sirve para
+        partidas completas.
+        :param interval: Segundos entre muestras.
+        :param thread_id: Hilo a observar (por defecto, el que crea el muestreador).
+        """
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.stacks = {}  # Pila colapsada ("raíz;...;hoja") -> muestras
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Empieza a muestrear."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Deja de muestrear y espera al hilo."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            stack = ";".join(reversed(names))
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+            self.samples += 1
+
+    def write_collapsed(self, path):
+        """
+        Guarda las pilas en formato colapsado ("a;b;c muestras"), el que leen
+        flamegraph.pl, speedscope o inferno para dibujar la gráfica de llamas.
+        """
+        with open(path, "w") as output:
+            for stack, count in sorted(self.stacks.items()):
+                output.write(f"{stack} {count}\n")
+
+    def top_functions(self, files=TARGET_FILES, limit=TOP_FUNCTIONS):
+        """
+        Funciones de los módulos indicados con más muestras.
+        :return: Lista de (función, muestras propias, muestras totales) por muestras totales.
+        """
+        own = {}
+        total = {}
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            leaf = frames[-1]
+            for name in set(frames):
+                if name.split(":", 1)[0] in files:
+                    total[name] = total.get(name, 0) + count
+            if leaf.split(":", 1)[0] in files:
+                own[leaf] = own.get(leaf, 0) + count
+        ranked = sorted(total, key=lambda name: (-total[name], name))[:limit]
+        return [(name, own.get(name, 0), total[name]) for name in ranked]
+
+
+class Profiler:
+    def __init__(self, mode, directory=DEFAULT_DIRECTORY, interval=SAMPLE_INTERVAL, prefix=""):
+        """
+        Perfilado de partidas. Con 'moves' cada movimiento de la IA se mide con
+        cProfile y se guarda en un .prof; con 'sample' un StackSampler recorre la
+        partida entera y deja las pilas colapsadas. Ambos modos escriben un
+        resumen con las funciones más costosas de board.py y ai.py.
+        :param mode: 'moves' o 'sample'.
+        :param directory: Carpeta de los archivos (se crea si no existe).
+        :param interval: Segundos entre muestras en el modo 'sample'.
+        :param prefix: Prefijo de los nombres de archivo (por ejemplo, la partida).
+        """
+        if mode not in MODES:
+            raise ValueError(f"Modo de perfilado desconocido: {mode}")
+        self.mode = mode
+        self.directory = directory
+        self.interval = interval
+        self.prefix = prefix
+        self.moves = 0
+        self.stats = None  # pstats.Stats acumulado de todos los movimientos
+        self.sampler = None
+        self.finished = False
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, name):
+        """Ruta de un archivo de salida."""
+        return os.path.join(self.directory, self.prefix + name)
+
+    def profile_move(self, label, function, *args, **kwargs):
+        """
+        Ejecuta un movimiento de la IA; en modo 'moves', bajo cProfile.
+        :param label: Nombre del jugador para el archivo.
+        :return: Lo que devuelva function.
+        """
+        if self.mode != "moves":
+            return function(*args, **kwargs)
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        result = profile.runcall(function, *args, **kwargs)
+        elapsed = time.perf_counter() - start
+        self.moves += 1
+        path = self.path(f"move-{self.moves:04d}-{label}.prof")
+        profile.dump_stats(path)
+        if self.stats is None:
+            self.stats = pstats.Stats(path)
+        else:
+            self.stats.add(path)
+        with open(self.path("moves.txt"), "a") as log:
+            log.write(f"{self.moves} {label} {elapsed:.4f} {os.path.basename(path)}\n")
+        return result
+
+    def start_game(self):
+        """
+        Empieza el perfilado de una partida. El final se registra también con
+        atexit, para las partidas que terminan con exit().
+        """
+        self.finished = False
+        if self.mode == "sample":
+            self.sampler = StackSampler(self.interval)
+            self.sampler.start()
+        atexit.register(self.end_game)
+
+    def end_game(self):
+        """
+        Termina la partida: guarda las pilas colapsadas (modo 'sample') y el
+        resumen. Solo actúa la primera vez.
+        :return: Texto del resumen, o None si ya se había terminado.
+        """
+        if self.finished:
+            return None
+        self.finished = True
+        atexit.unregister(self.end_game)
+        if self.sampler is not None:
+            self.sampler.stop()
+            self.sampler.write_collapsed(self.path("game.collapsed"))
+        summary = self.summary()
+        with open(self.path("summary.txt"), "w") as output:
+            output.write(summary)
+        return summary
+
+    def summary(self):
+        """Resumen de las funciones más costosas de board.py y ai.py."""
+        lines = []
+        if self.mode == "moves":
+            lines.append(f"Movimientos perfilados: {self.moves}")
+            if self.stats is not None:
+                lines.append(f"{'propio s':>10} {'total s':>10} {'llamadas':>10}  función")
+                rows = [
+                    (key, value) for key, value in self.stats.stats.items()
+                    if os.path.basename(key[0]) in TARGET_FILES
+                ]
+                rows.sort(key=lambda row: -row[1][2])
+                for (filename, line, name), (_, calls, own, total, _) in rows[:TOP_FUNCTIONS]:
+                    lines.append(
+                        f"{own:>10.4f} {total:>10.4f} {calls:>10}  {os.path.basename(filename)}:{line}({name})"
+                    )
+        elif self.sampler is not None:
+            samples = self.sampler.samples
+            lines.append(f"Muestras: {samples} (cada {self.interval * 1000:.1f} ms)")
+            lines.append(f"{'propio %':>9} {'total %':>9}  función")
+            for name, own, total in self.sampler.top_functions():
+                lines.append(f"{100.0 * own / samples:>9.1f} {100.0 * total / samples:>9.1f}  {name}")
+        return "\n".join(lines) + "\n"
+
+
+_ENVIRONMENT_PROFILER = []
+
+
+def environment_profiler():
+    """
+    Perfilador del proceso configurado con GOMOKU_PROFILE (compartido por las
+    IA y el bucle de juego).
+    :return: Profiler, o None si la variable no está definida.
+    """
+    if not _ENVIRONMENT_PROFILER:
+        mode = os.environ.get(ENV_MODE)
+        profiler = None
+        if mode:
+            profiler = Profiler(
+                mode,
+                os.environ.get(ENV_DIRECTORY, DEFAULT_DIRECTORY),
+                float(os.environ.get(ENV_INTERVAL, SAMPLE_INTERVAL)),
+            )
+        _ENVIRONMENT_PROFILER.append(profiler)
+    return _ENVIRONMENT_PROFILER[0]
+
+
+def print_stats(path, limit=TOP_FUNCTIONS):
+    """
+    Resumen en texto de un .prof guardado (ordenado por tiempo propio).
+    :return: Texto de pstats.
+    """
+    stream = io.StringIO()
+    pstats.Stats(path, stream=stream).sort_stats("tottime").print_stats(limit)
+    return stream.getvalue()
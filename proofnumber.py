@@ -0,0 +1,297 @@
+# proofnumber.py
+
+import argparse
+import time
+
+from positions import POSITIONS, load_position
+from tactics import open_three_cells
+from threatspace import SearchExhausted
+
+INF = 1 << 30  # Número de prueba o refutación infinito
+
+
+class ProofNumberSearch:
+    def __init__(self, entries=1 << 18, node_limit=200000, time_limit=None, max_depth=40, threats_only=True):
+        """
+        Búsqueda en profundidad por números de prueba (df-pn) para demostrar o
+        refutar que el jugador que mueve gana por la fuerza.
+        :param entries: Posiciones máximas en la tabla (límite de memoria).
+        :param node_limit: Nodos máximos por llamada a solve.
+        :param time_limit: Segundos máximos por llamada a solve (None = sin límite).
+        :param max_depth: Plies máximos de una línea; más allá el atacante no gana.
+        :param threats_only: Si es True, el atacante solo juega amenazas (cincos,
+                             cuatros, treses abiertos y capturas); el defensor
+                             siempre prueba todas sus respuestas. Una refutación
+                             solo es definitiva si el atacante pudo jugarlo todo
+                             y ninguna línea llegó a max_depth.
+        """
+        self.entries = entries
+        self.node_limit = node_limit
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.threats_only = threats_only
+        # Clave de posición -> [número de prueba, número de refutación, nodos invertidos,
+        # True si la refutación depende de una lista recortada o del límite de profundidad]
+        self.table = {}
+        self.attacker = None
+        self.nodes = 0
+        self.collections = 0
+        self.deadline = None
+
+    def key(self, board):
+        """
+        Clave de la posición: hash Zobrist (fichas, turno y capturas) más las
+        banderas de cinco pendiente y de fin, que también deciden el resultado.
+        """
+        return board.search_key
+
+    def solve(self, board, attacker=None):
+        """
+        Intenta demostrar una victoria forzada del jugador que mueve.
+        :param board: Instancia del tablero (clase Board); queda como estaba.
+        :param attacker: Jugador que mueve (por defecto, board.turn).
+        :return: Tupla (resultado, línea): True si está demostrada, False si está
+                 refutada, None si se agotó el presupuesto o la refutación no es
+                 definitiva; la línea es la variante principal de la prueba
+                 (vacía si no la hay).
+        """
+        attacker = attacker or board.turn
+        if attacker != self.attacker:
+            self.table.clear()  # Los números de prueba dependen de quién ataca
+            self.attacker = attacker
+        self.nodes = 0
+        self.deadline = time.perf_counter() + self.time_limit if self.time_limit is not None else None
+        root_depth = len(board.move_stack)
+        try:
+            pn, dn, inexact = self.mid(board, INF - 1, INF - 1, attacker, 0)
+        except SearchExhausted:
+            while len(board.move_stack) > root_depth:
+                board.pop()
+            return None, []
+        if pn == 0:
+            return True, self.proof_line(board, attacker)
+        if dn == 0 and not inexact:
+            return False, []
+        return None, []
+
+    def _tick(self):
+        """Cuenta un nodo y corta si se supera el presupuesto."""
+        self.nodes += 1
+        if self.nodes > self.node_limit:
+            raise SearchExhausted()
+        self._check_time()
+
+    def _check_time(self):
+        """
+        Corta si se acabó el tiempo. Se mira en cada nodo y en cada hijo que se
+        genera: un nodo del defensor prueba todas las candidatas.
+        """
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchExhausted()
+
+    def moves(self, board, symbol):
+        """
+        Movimientos a considerar en un nodo. El defensor siempre prueba todas
+        las candidatas: un cinco no gana en el acto, porque el rival aún puede
+        romperlo capturando. El atacante juega su cinco si lo tiene; ante un
+        cinco del defensor solo cuentan taparlo o capturar y, con threats_only,
+        se limita a sus amenazas.
+        :return: Tupla (lista ordenada de tuplas (fila, columna), True si la
+                 lista no descarta ningún movimiento que pueda ganar).
+        """
+        if symbol != self.attacker:
+            return board.candidate_moves(), True
+        opponent = "X" if symbol == "O" else "O"
+        own_fives = board.five_cells(symbol)
+        if own_fives:
+            return sorted(own_fives), False
+        opponent_fives = board.five_cells(opponent)
+        if opponent_fives:
+            return sorted(opponent_fives | board.capture_cells(symbol)), True
+        if self.threats_only:
+            cells = board.four_cells(symbol) | board.capture_cells(symbol) | open_three_cells(board, symbol)
+            return sorted(cells), False
+        return board.candidate_moves(), True
+
+    def expand(self, board, symbol, depth):
+        """
+        Genera los hijos de un nodo una sola vez: los terminales llevan sus
+        números fijos y el resto la clave con la que consultar la tabla.
+        :return: Tupla (lista de (movimiento, clave o None, números terminales
+                 (prueba, refutación, inexacto) o None), True si la lista de
+                 movimientos es completa).
+        """
+        children = []
+        moves, complete = self.moves(board, symbol)
+        for move in moves:
+            self._check_time()
+            if not board.push(move, symbol):
+                continue  # Movimiento prohibido (doble tres)
+            board.check_winner(symbol)  # Igual que el bucle de juego tras cada movimiento
+            winner = board.winner()
+            if winner is not None:
+                children.append((move, None, (0, INF, False) if winner == self.attacker else (INF, 0, False)))
+            elif board.is_draw():
+                children.append((move, None, (INF, 0, False)))
+            elif depth + 1 >= self.max_depth:
+                children.append((move, None, (INF, 0, True)))  # Sin resolver, no refutado
+            else:
+                children.append((move, self.key(board), None))
+            board.pop()
+        return children, complete
+
+    def mid(self, board, pn_threshold, dn_threshold, symbol, depth):
+        """
+        Expande un nodo hasta que sus números alcancen los umbrales.
+        :param symbol: Jugador que mueve en el nodo (nodo O si es el atacante).
+        :return: Tupla (número de prueba, número de refutación, True si una
+                 refutación no es definitiva) del nodo.
+        """
+        self._tick()
+        key = self.key(board)
+        start_nodes = self.nodes
+        or_node = symbol == self.attacker
+        opponent = "X" if symbol == "O" else "O"
+        expanded, complete = self.expand(board, symbol, depth)
+        table = self.table
+        inexact = False
+        while True:
+            if not expanded:
+                # Sin movimientos legales: si el defensor no puede tapar un cinco,
+                # pierde; en otro caso el atacante no consigue nada (si su lista
+                # estaba recortada, sin que eso sea una refutación definitiva)
+                if not or_node and board.five_cells(self.attacker):
+                    pn, dn = 0, INF
+                else:
+                    pn, dn, inexact = INF, 0, not complete
+                break
+            children = []
+            for move, child_key, values in expanded:
+                if values is None:
+                    entry = table.get(child_key)
+                    values = (entry[0], entry[1], entry[3]) if entry is not None else (1, 1, False)
+                children.append((values[0], values[1], move, values[2]))
+            if or_node:
+                pn = min(child[0] for child in children)
+                dn = min(INF, sum(child[1] for child in children))
+            else:
+                pn = min(INF, sum(child[0] for child in children))
+                dn = min(child[1] for child in children)
+            if pn >= pn_threshold or dn >= dn_threshold:
+                if dn == 0:
+                    # Refutación definitiva: en un nodo O, todos los hijos refutados
+                    # de verdad y la lista completa; en un nodo Y, basta un hijo
+                    if or_node:
+                        inexact = not complete or any(child[3] for child in children)
+                    else:
+                        inexact = not any(child[1] == 0 and not child[3] for child in children)
+                break
+            # El hijo más prometedor y el umbral que le deja el segundo mejor
+            index = 0 if or_node else 1
+            children.sort(key=lambda child: child[index])
+            best_pn, best_dn, best_move, _ = children[0]
+            second = children[1][index] if len(children) > 1 else INF
+            if or_node:
+                child_pn_threshold = min(pn_threshold, second + 1)
+                child_dn_threshold = min(INF - 1, dn_threshold - dn + best_dn)
+            else:
+                child_pn_threshold = min(INF - 1, pn_threshold - pn + best_pn)
+                child_dn_threshold = min(dn_threshold, second + 1)
+            board.push(best_move, symbol)
+            board.check_winner(symbol)
+            self.mid(board, child_pn_threshold, child_dn_threshold, opponent, depth + 1)
+            board.pop()
+        self.store(key, pn, dn, self.nodes - start_nodes, inexact)
+        return pn, dn, inexact
+
+    def store(self, key, pn, dn, work, inexact=False):
+        """
+        Guarda los números de una posición. Si la tabla se llena, se descarta
+        la mitad de las posiciones no resueltas con menos trabajo invertido.
+        :param inexact: True si la refutación (dn == 0) no es definitiva.
+        """
+        table = self.table
+        entry = table.get(key)
+        if entry is not None:
+            entry[0], entry[1], entry[2], entry[3] = pn, dn, entry[2] + work, inexact
+            return
+        if len(table) >= self.entries:
+            self.collect()
+        table[key] = [pn, dn, work, inexact]
+
+    def collect(self):
+        """Recolección de la tabla: conserva las posiciones resueltas y las más costosas."""
+        self.collections += 1
+        table = self.table
+        open_keys = [key for key, entry in table.items() if entry[0] and entry[1]]
+        open_keys.sort(key=lambda key: table[key][2])
+        for key in open_keys[:max(len(open_keys) // 2, len(table) - self.entries // 2)]:
+            del table[key]
+
+    def proof_line(self, board, attacker):
+        """
+        Variante principal de una posición demostrada: el atacante juega un hijo
+        demostrado (el que ya gana, si lo hay) y el defensor la respuesta que más
+        trabajo costó refutar.
+        :return: Lista de movimientos alternos empezando por el atacante.
+        """
+        line = []
+        symbol = attacker
+        while len(line) < self.max_depth:
+            best = None
+            for move in self.moves(board, symbol)[0]:
+                if not board.push(move, symbol):
+                    continue
+                board.check_winner(symbol)
+                winner = board.winner()
+                entry = self.table.get(self.key(board))
+                board.pop()
+                if winner is not None:
+                    if winner != attacker:
+                        continue
+                    if symbol == attacker:
+                        best = (INF, move)
+                        break
+                    entry = (0, INF, -INF)  # Respuesta que pierde en el acto
+                if entry is None or entry[0] != 0:
+                    continue
+                # Atacante: la prueba más barata; defensor: la más resistente
+                rank = -entry[2] if symbol == attacker else entry[2]
+                if best is None or rank > best[0]:
+                    best = (rank, move)
+            if best is None:
+                break
+            line.append(best[1])
+            board.push(best[1], symbol)
+            board.check_winner(symbol)
+            if board.winner() is not None:
+                break
+            symbol = "X" if symbol == "O" else "O"
+        for _ in line:
+            board.pop()
+        return line
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Demuestra si el jugador que mueve gana por la fuerza")
+    parser.add_argument("--position", default="midgame", choices=list(POSITIONS), help="Posición de positions.py")
+    parser.add_argument("--nodes", type=int, default=200000, help="Nodos máximos")
+    parser.add_argument("--seconds", type=float, default=None, help="Segundos máximos")
+    parser.add_argument("--entries", type=int, default=1 << 18, help="Posiciones máximas en la tabla")
+    parser.add_argument("--all-moves", action="store_true", help="El atacante prueba todos los movimientos")
+    args = parser.parse_args()
+    board = load_position(args.position)
+    solver = ProofNumberSearch(
+        entries=args.entries, node_limit=args.nodes, time_limit=args.seconds, threats_only=not args.all_moves,
+    )
+    start = time.perf_counter()
+    result, line = solver.solve(board)
+    elapsed = time.perf_counter() - start
+    verdict = {True: "victoria forzada", False: "sin victoria forzada", None: "sin resolver"}[result]
+    print(f"{args.position}: {verdict} para {board.turn} ({solver.nodes} nodos, {elapsed:.2f} s)")
+    if line:
+        print("Línea: " + " ".join(f"{row},{col}" for row, col in line))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# stats.py
+
+import json
+import time
+
+
+class SearchStats:
+    def __init__(self):
+        """
+        Estadísticas de una decisión de AIPlayer.get_best_move, o de varias
+        sumadas con merge: tiempo por fase de la cascada de reglas, fase que
+        decidió el movimiento, nodos, hojas evaluadas (y su tiempo), profundidad,
+        factor de ramificación y cortes de la búsqueda.
+        """
+        self.moves = 0
+        self.seconds = 0.0
+        self.phases = {}  # Fase -> segundos
+        self.decided_by = {}  # Fase -> movimientos decididos en ella
+        self.nodes = 0
+        self.leaves = 0
+        self.evaluate_seconds = 0.0
+        self.depth = 0  # Profundidad completada por la profundización iterativa
+        self.max_ply = 0  # Ply más lejano visitado
+        self.expanded = 0  # Nodos interiores con algún hijo buscado
+        self.children = 0  # Hijos buscados desde esos nodos
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.threat_nodes = 0
+        self.playouts = 0
+        self._start = None
+        self._last = None
+
+    def start(self):
+        """Pone en marcha el reloj de la decisión."""
+        self._start = self._last = time.perf_counter()
+
+    def lap(self, phase):
+        """Suma a la fase el tiempo transcurrido desde la vuelta anterior."""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def finish(self, phase):
+        """
+        Cierra la decisión.
+        :param phase: Nombre de la fase que dio el movimiento.
+        """
+        self.moves = 1
+        self.seconds = time.perf_counter() - self._start
+        self.decided_by = {phase: 1}
+
+    @property
+    def branching(self):
+        """Factor de ramificación efectivo: hijos buscados por nodo interior."""
+        return self.children / self.expanded if self.expanded else 0.0
+
+    @property
+    def nodes_per_second(self):
+        """Nodos por segundo de la fase de búsqueda."""
+        seconds = self.phases.get("search", 0.0)
+        return self.nodes / seconds if seconds else 0.0
+
+    def merge(self, other):
+        """
+        Suma otras estadísticas (por ejemplo, todas las de una partida).
+        Las profundidades se quedan con el máximo.
+        :return: self.
+        """
+        self.moves += other.moves
+        self.seconds += other.seconds
+        for total, part in ((self.phases, other.phases), (self.decided_by, other.decided_by)):
+            for phase, value in part.items():
+                total[phase] = total.get(phase, 0) + value
+        self.nodes += other.nodes
+        self.leaves += other.leaves
+        self.evaluate_seconds += other.evaluate_seconds
+        self.depth = max(self.depth, other.depth)
+        self.max_ply = max(self.max_ply, other.max_ply)
+        self.expanded += other.expanded
+        self.children += other.children
+        self.cutoffs += other.cutoffs
+        self.first_move_cutoffs += other.first_move_cutoffs
+        self.threat_nodes += other.threat_nodes
+        self.playouts += other.playouts
+        return self
+
+    __iadd__ = merge
+
+    def to_dict(self):
+        """
+        Diccionario serializable con todos los campos y los derivados.
+        """
+        return {
+            "moves": self.moves,
+            "seconds": self.seconds,
+            "phases": dict(self.phases),
+            "decided_by": dict(self.decided_by),
+            "nodes": self.nodes,
+            "nodes_per_second": self.nodes_per_second,
+            "leaves": self.leaves,
+            "evaluate_seconds": self.evaluate_seconds,
+            "depth": self.depth,
+            "max_ply": self.max_ply,
+            "branching": self.branching,
+            "cutoffs": self.cutoffs,
+            "first_move_cutoffs": self.first_move_cutoffs,
+            "threat_nodes": self.threat_nodes,
+            "playouts": self.playouts,
+        }
+
+    def to_json(self):
+        """Una línea JSON (formato JSON Lines)."""
+        return json.dumps(self.to_dict(), sort_keys=True)
+
+
+def write_jsonl(stats, stream):
+    """
+    Escribe estadísticas en formato JSON Lines, una por línea.
+    :param stats: Iterable de SearchStats.
+    :param stream: Archivo de texto abierto para escribir.
+    """
+    for item in stats:
+        stream.write(item.to_json() + "\n")
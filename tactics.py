@@ -0,0 +1,134 @@
+# tactics.py
+
+from itertools import combinations
+
+from linepatterns import BROKEN_THREE, OPEN_THREE
+
+# Patrones sobre una línea vista desde un jugador ("M" propia, "T" rival,
+# "." vacía, "|" borde), con las posiciones de las casillas a jugar.
+
+
+def _window_patterns(length, stones, padded=False):
+    """
+    Genera las ventanas de length casillas con stones fichas propias y el resto vacías.
+    :param padded: Si es True, la ventana va rodeada de una casilla vacía a cada lado.
+    :return: Lista de (patrón, posiciones vacías dentro del patrón).
+    """
+    patterns = []
+    for own in combinations(range(length), stones):
+        cells = ["M" if i in own else "." for i in range(length)]
+        offset = 1 if padded else 0
+        empty = tuple(i + offset for i in range(length) if i not in own)
+        text = "".join(cells)
+        if padded:
+            text = "." + text + "."
+        patterns.append((text, empty))
+    return patterns
+
+
+WIN_PATTERNS = _window_patterns(5, 4)  # Jugar el hueco completa 5
+FOUR_PATTERNS = _window_patterns(5, 3)  # Jugar un hueco deja 4 en una ventana de 5
+THREE_PATTERNS = _window_patterns(4, 2, padded=True)  # Jugar un hueco deja un tres abierto
+CAPTURE_THREAT_PATTERNS = [(".TT.", (0, 3))]  # Jugar amenaza capturar en la siguiente
+
+_TABLES = {
+    "X": str.maketrans({"X": "M", "O": "T"}),
+    "O": str.maketrans({"O": "M", "X": "T"}),
+}
+
+
+class ThreatReport:
+    def __init__(self):
+        """
+        Resultado del análisis táctico. Cada campo es un diccionario por jugador
+        que asocia casilla (fila, columna) con el número de patrones que la usan.
+        """
+        self.wins = {"X": {}, "O": {}}
+        self.fours = {"X": {}, "O": {}}
+        self.open_threes = {"X": {}, "O": {}}
+        self.captures = {"X": {}, "O": {}}
+        self.capture_threats = {"X": {}, "O": {}}
+
+    @staticmethod
+    def ranked(cells):
+        """
+        Ordena las casillas por número de patrones (en empate, por fila y columna).
+        :param cells: Diccionario casilla -> número de patrones.
+        :return: Lista de tuplas (fila, columna).
+        """
+        return sorted(cells, key=lambda cell: (-cells[cell], cell))
+
+
+def _collect(text, cells, patterns, found):
+    """Añade a found las casillas de cada aparición (solapada) de los patrones."""
+    for pattern, empty in patterns:
+        start = text.find(pattern)
+        while start != -1:
+            for offset in empty:
+                cell = cells[start + offset]
+                found[cell] = found.get(cell, 0) + 1
+            start = text.find(pattern, start + 1)
+
+
+def scan_threats(board):
+    """
+    Recorre una sola vez cada línea del tablero con fichas y construye el informe
+    de amenazas de ambos jugadores: victorias, cuatros, treses abiertos y amenazas
+    de captura. Las capturas salen del índice de capturas del tablero.
+    :param board: Instancia del tablero (clase Board).
+    :return: ThreatReport.
+    """
+    report = ThreatReport()
+    grid = board.grid
+    for line_cells in board.geometry.lines:
+        # Se añade el borde para que no cuente como casilla vacía
+        cells = (None,) + line_cells + (None,)
+        line = "|" + "".join([grid[r][c] for r, c in line_cells]) + "|"
+        has_x = "X" in line
+        has_o = "O" in line
+        if not (has_x or has_o):
+            continue
+        for symbol, present in (("X", has_x), ("O", has_o)):
+            text = line.translate(_TABLES[symbol])
+            if present:
+                _collect(text, cells, WIN_PATTERNS, report.wins[symbol])
+                _collect(text, cells, FOUR_PATTERNS, report.fours[symbol])
+                _collect(text, cells, THREE_PATTERNS, report.open_threes[symbol])
+            if "TT" in text:
+                _collect(text, cells, CAPTURE_THREAT_PATTERNS, report.capture_threats[symbol])
+    for symbol in ("X", "O"):
+        report.captures[symbol] = dict(board.capture_moves[symbol])
+    return report
+
+
+def forms_open_three(board, row, col, symbol):
+    """
+    Comprueba si colocar en la casilla vacía forma un tres abierto (también
+    partido) en alguna dirección que pase por ella.
+    :return: True si se forma.
+    """
+    for flags in board.move_patterns(row, col, symbol):
+        if flags & (OPEN_THREE | BROKEN_THREE):
+            return True
+    return False
+
+
+def open_three_cells(board, symbol):
+    """
+    Casillas donde el jugador formaría un tres abierto: se parte de las ventanas
+    de 5 con dos fichas suyas y ninguna rival, y se comprueba cada hueco.
+    :return: Conjunto de tuplas (fila, columna).
+    """
+    opponent_counts = board.window_counts["X" if symbol == "O" else "O"]
+    cells = set()
+    checked = set()
+    for wid in board.window_sets[symbol][2]:
+        if opponent_counts[wid]:
+            continue
+        for row, col in board.geometry.window_cells[wid]:
+            if board.grid[row][col] != "." or (row, col) in checked:
+                continue
+            checked.add((row, col))
+            if forms_open_three(board, row, col, symbol):
+                cells.add((row, col))
+    return cells
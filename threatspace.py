@@ -0,0 +1,160 @@
+# threatspace.py
+
+import time
+
+from tactics import open_three_cells
+
+FIVE = 5
+FOUR = 4
+THREE = 3
+
+
+class SearchExhausted(Exception):
+    """Se lanza cuando la búsqueda de amenazas agota sus nodos o su tiempo."""
+
+
+class ThreatSpaceSearch:
+    def __init__(self, node_limit=3000, time_limit=0.05, max_depth=12):
+        """
+        Búsqueda de victorias forzadas en el espacio de amenazas: secuencias de
+        cuatros (VCF) y de cuatros o treses abiertos (VCT) y sus respuestas forzadas.
+        :param node_limit: Nodos máximos por llamada a solve.
+        :param time_limit: Segundos máximos por llamada a solve.
+        :param max_depth: Amenazas máximas del atacante en una secuencia.
+        """
+        self.node_limit = node_limit
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.nodes = 0
+        self.deadline = None
+
+    def solve(self, board, attacker, threes=True, deadline=None):
+        """
+        Busca una victoria forzada para el atacante, primero solo con cuatros
+        y después (si threes) también con treses abiertos.
+        :param board: Instancia del tablero (clase Board).
+        :param attacker: Jugador que mueve y ataca ('X' o 'O').
+        :param threes: Si es True, prueba también VCT.
+        :param deadline: Instante (time.perf_counter) que acota además el
+                         time_limit propio (por ejemplo, el del movimiento).
+        :return: Lista de movimientos alternos empezando por el atacante, o None.
+        """
+        self.nodes = 0
+        self.deadline = time.perf_counter() + self.time_limit if self.time_limit is not None else None
+        if deadline is not None and (self.deadline is None or deadline < self.deadline):
+            self.deadline = deadline
+        root_depth = len(board.move_stack)
+        try:
+            line = self.attack(board, attacker, self.max_depth, False)
+            if line is None and threes:
+                line = self.attack(board, attacker, self.max_depth, True)
+        except SearchExhausted:
+            while len(board.move_stack) > root_depth:
+                board.pop()
+            return None
+        return line
+
+    def _tick(self):
+        """
+        Cuenta un nodo y corta si se supera el presupuesto. Se llama en cada
+        nodo de ataque y antes de probar cada defensa: un nodo de ataque puede
+        abrir una veintena de respuestas, así que el reloj se mira siempre.
+        """
+        self.nodes += 1
+        if self.nodes > self.node_limit:
+            raise SearchExhausted()
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchExhausted()
+
+    def threat_moves(self, board, attacker, threes):
+        """
+        Movimientos de amenaza del atacante: cincos, cuatros y (si threes) treses abiertos.
+        :return: Lista de (movimiento, tipo de amenaza).
+        """
+        moves = [(move, FIVE) for move in sorted(board.five_cells(attacker))]
+        seen = {move for move, _ in moves}
+        for move in sorted(board.four_cells(attacker)):
+            if move not in seen:
+                seen.add(move)
+                moves.append((move, FOUR))
+        if threes:
+            for move in sorted(open_three_cells(board, attacker)):
+                if move not in seen:
+                    moves.append((move, THREE))
+        return moves
+
+    def defenses(self, board, move, attacker, kind):
+        """
+        Respuestas del defensor a una amenaza recién jugada. Contra un cinco solo
+        sirve capturar; contra un cuatro, taparlo, capturar o hacer su propio cinco;
+        contra un tres, además, tapar sus huecos o responder con un cuatro.
+        :return: Lista ordenada de movimientos.
+        """
+        defender = "X" if attacker == "O" else "O"
+        replies = board.capture_cells(defender)
+        if kind == FIVE:
+            return sorted(replies)
+        replies |= board.five_cells(attacker)
+        replies |= board.five_cells(defender)
+        if kind == THREE:
+            attacker_counts = board.window_counts[attacker]
+            defender_counts = board.window_counts[defender]
+            row, col = move
+            for wid in board.geometry.windows_by_cell[row * board.size + col]:
+                if attacker_counts[wid] == 3 and not defender_counts[wid]:
+                    for cell in board.geometry.window_cells[wid]:
+                        if board.grid[cell[0]][cell[1]] == ".":
+                            replies.add(cell)
+            replies |= board.four_cells(defender)
+        return sorted(replies)
+
+    def attack(self, board, attacker, depth, threes):
+        """
+        Nodo O: el atacante busca una amenaza a la que ninguna defensa resista.
+        :return: Línea principal (lista de movimientos) o None si no la encuentra.
+        """
+        self._tick()
+        defender = "X" if attacker == "O" else "O"
+        if depth == 0:
+            return None
+        if board.five_cells(defender) and not board.five_cells(attacker):
+            return None  # El defensor amenaza cinco: el atacante ya no fuerza nada
+        for move, kind in self.threat_moves(board, attacker, threes):
+            if not board.push(move, attacker):
+                continue  # Movimiento prohibido (doble tres)
+            board.check_winner(attacker)
+            if board.winner() == attacker:
+                board.pop()
+                return [move]
+            line = self.defend(board, move, attacker, kind, depth, threes)
+            board.pop()
+            if line is not None:
+                return [move] + line
+        return None
+
+    def defend(self, board, move, attacker, kind, depth, threes):
+        """
+        Nodo Y: todas las defensas legales deben perder.
+        :return: Continuación contra la defensa más resistente, o None si alguna aguanta.
+        """
+        defender = "X" if attacker == "O" else "O"
+        best_line = []
+        for reply in self.defenses(board, move, attacker, kind):
+            self._tick()
+            if not board.push(reply, defender):
+                continue
+            board.check_winner(defender)
+            winner = board.winner()
+            if winner == defender:
+                board.pop()
+                return None
+            if winner == attacker:
+                line = []
+            else:
+                line = self.attack(board, attacker, depth - 1, threes)
+            board.pop()
+            if line is None:
+                return None
+            if not best_line or len(line) + 1 > len(best_line):
+                best_line = [reply] + line
+        return best_line
@@ -0,0 +1,313 @@
+# transposition.py
+
+import multiprocessing
+import os
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+EXACT = 0  # Puntuación exacta
+LOWER = 1  # Cota inferior (la búsqueda cortó por arriba)
+UPPER = 2  # Cota superior (ningún movimiento superó alfa)
+
+# Estimación de memoria por entrada en CPython: tupla de la entrada, clave de
+# 64 bits, puntuación, tupla del movimiento y la ranura de la lista
+ENTRY_BYTES = 200
+DEFAULT_ENTRIES = 1 << 20
+
+
+class TranspositionTable:
+    def __init__(self, entries=None, megabytes=None):
+        """
+        Tabla de transposiciones de tamaño fijo indexada por hash Zobrist.
+        Cada cubo tiene dos ranuras: una que prefiere profundidad y otra que
+        siempre se reemplaza.
+        :param entries: Número máximo de entradas.
+        :param megabytes: Límite de memoria aproximado en MB (si no se dan entradas).
+        """
+        if entries is None:
+            if megabytes is not None:
+                entries = int(megabytes * 1024 * 1024) // ENTRY_BYTES
+            else:
+                entries = DEFAULT_ENTRIES
+        self.buckets = max(1, entries // 2)
+        self.capacity = self.buckets * 2
+        self.table = [None] * self.capacity
+        self.age = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    def new_search(self):
+        """
+        Marca el comienzo de una nueva búsqueda: las entradas de búsquedas
+        anteriores se conservan, pero ceden la ranura de profundidad.
+        """
+        self.age += 1
+
+    def clear(self):
+        """Vacía la tabla y reinicia los contadores."""
+        self.table = [None] * self.capacity
+        self.age = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    def probe(self, key):
+        """
+        Busca una posición en la tabla.
+        :param key: Hash Zobrist de la posición.
+        :return: Tupla (clave, puntuación, profundidad, cota, movimiento, edad) o None.
+        """
+        index = (key % self.buckets) * 2
+        entry = self.table[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        entry = self.table[index + 1]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def store(self, key, score, depth, bound, move):
+        """
+        Guarda el resultado de buscar una posición.
+        :param key: Hash Zobrist de la posición.
+        :param score: Puntuación obtenida.
+        :param depth: Profundidad restante con la que se buscó.
+        :param bound: EXACT, LOWER o UPPER.
+        :param move: Mejor movimiento encontrado (o None).
+        """
+        index = (key % self.buckets) * 2
+        deep = self.table[index]
+        if deep is not None and deep[0] == key and move is None:
+            move = deep[4]  # Conservar el movimiento conocido de la posición
+        entry = (key, score, depth, bound, move, self.age)
+        self.stores += 1
+        if deep is None or deep[0] == key or depth >= deep[2] or deep[5] != self.age:
+            if deep is not None and deep[0] != key:
+                self.overwrites += 1
+            self.table[index] = entry
+            return
+        other = self.table[index + 1]
+        if other is not None and other[0] != key:
+            self.overwrites += 1
+        self.table[index + 1] = entry
+
+    def filled(self):
+        """Devuelve el número de ranuras ocupadas."""
+        return sum(1 for entry in self.table if entry is not None)
+
+    def stats(self):
+        """
+        Contadores de uso para dimensionar la tabla.
+        :return: Diccionario con aciertos, fallos, escrituras, sobrescrituras y ocupación.
+        """
+        probes = self.hits + self.misses
+        return {
+            "capacity": self.capacity,
+            "megabytes": self.capacity * ENTRY_BYTES / (1024 * 1024),
+            "filled": self.filled(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / probes if probes else 0.0,
+            "stores": self.stores,
+            "overwrites": self.overwrites,
+        }
+
+
+# Registro empaquetado de la tabla compartida: dos enteros de 64 bits,
+# (clave ^ datos, datos). Una lectura es válida si al deshacer el XOR sale la
+# clave buscada, así una escritura a medias de otro proceso se descarta sola.
+RECORD = struct.Struct("<QQ")
+HEADER = struct.Struct("<Q")  # Edad de la búsqueda actual, la escribe el propietario
+NO_MOVE = 0xFFFF
+SCORE_OFFSET = 1 << 31
+# Tablas compartidas creadas en este proceso: nombre -> (pid, tabla). Con el pid
+# se distinguen de las heredadas al hacer fork
+_CREATED = {}
+
+
+def pack_data(score, depth, bound, move_index, age):
+    """Empaqueta puntuación, profundidad, cota, movimiento y edad en 64 bits."""
+    return (
+        (score + SCORE_OFFSET)
+        | (min(depth, 255) << 32)
+        | ((bound | (age & 63) << 2) << 40)
+        | (move_index << 48)
+    )
+
+
+def unpack_data(data):
+    """Operación inversa a pack_data: (puntuación, profundidad, cota, movimiento, edad)."""
+    flags = (data >> 40) & 0xFF
+    return (
+        (data & 0xFFFFFFFF) - SCORE_OFFSET,
+        (data >> 32) & 0xFF,
+        flags & 3,
+        data >> 48,
+        flags >> 2,
+    )
+
+
+class SharedTranspositionTable:
+    def __init__(self, entries=None, megabytes=None, size=19, name=None):
+        """
+        Tabla de transposiciones en memoria compartida (multiprocessing.shared_memory)
+        con registros de tamaño fijo y sin cerrojos. Misma interfaz que
+        TranspositionTable, de modo que cualquier AIPlayer puede usarla.
+        :param entries: Número máximo de entradas.
+        :param megabytes: Límite de memoria en MB (si no se dan entradas).
+        :param size: Lado del tablero (para codificar los movimientos).
+        :param name: Nombre de un bloque existente al que unirse (None = crear uno nuevo).
+        """
+        if entries is None:
+            if megabytes is not None:
+                entries = int(megabytes * 1024 * 1024) // RECORD.size
+            else:
+                entries = DEFAULT_ENTRIES
+        self.buckets = max(1, entries // 2)
+        self.capacity = self.buckets * 2
+        self.size = size
+        nbytes = HEADER.size + self.capacity * RECORD.size
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            self.shm.buf[:nbytes] = bytes(nbytes)
+            _CREATED[self.shm.name] = (os.getpid(), self)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            # Solo el propietario libera el bloque al terminar. Los procesos hijos
+            # comparten el resource_tracker del padre; uno independiente no, y
+            # eliminaría el bloque al salir si no se le quita del registro. En el
+            # proceso que lo creó el registro es del propietario y se conserva.
+            created = _CREATED.get(name)
+            own_process = created is not None and created[0] == os.getpid()
+            if multiprocessing.parent_process() is None and not own_process:
+                resource_tracker.unregister(self.shm._name, "shared_memory")
+        self.name = self.shm.name
+        self.buf = self.shm.buf
+        self.age = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    @classmethod
+    def attach(cls, name, entries, size=19):
+        """
+        Se une desde otro proceso a una tabla creada con el mismo número de entradas.
+        En el proceso que la creó devuelve la propia tabla original.
+        :param name: Atributo name de la tabla original.
+        """
+        created = _CREATED.get(name)
+        if created is not None and created[0] == os.getpid():
+            return created[1]
+        return cls(entries=entries, size=size, name=name)
+
+    def new_search(self):
+        """
+        El propietario marca el comienzo de una búsqueda; los demás procesos
+        leen la edad actual.
+        """
+        if self.owner:
+            self.age = (self.age + 1) & 63
+            HEADER.pack_into(self.buf, 0, self.age)
+        else:
+            self.age = HEADER.unpack_from(self.buf, 0)[0]
+
+    def clear(self):
+        """Vacía la tabla (solo debe hacerlo el propietario sin búsquedas en curso)."""
+        self.buf[:] = bytes(len(self.buf))
+        self.age = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    def close(self):
+        """Suelta el bloque compartido; el propietario además lo elimina."""
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            _CREATED.pop(self.name, None)
+            self.shm.unlink()
+
+    def _read(self, slot):
+        """Lee una ranura: (clave, datos) o None si está vacía o a medio escribir."""
+        checked_key, data = RECORD.unpack_from(self.buf, HEADER.size + slot * RECORD.size)
+        if not data:
+            return None
+        return checked_key ^ data, data
+
+    def _entry(self, key, data):
+        score, depth, bound, move_index, age = unpack_data(data)
+        move = None if move_index == NO_MOVE else divmod(move_index, self.size)
+        return (key, score, depth, bound, move, age)
+
+    def probe(self, key):
+        """
+        Busca una posición en la tabla.
+        :param key: Hash Zobrist de la posición.
+        :return: Tupla (clave, puntuación, profundidad, cota, movimiento, edad) o None.
+        """
+        index = (key % self.buckets) * 2
+        for slot in (index, index + 1):
+            record = self._read(slot)
+            if record is not None and record[0] == key:
+                self.hits += 1
+                return self._entry(key, record[1])
+        self.misses += 1
+        return None
+
+    def store(self, key, score, depth, bound, move):
+        """
+        Guarda el resultado de buscar una posición (misma política que TranspositionTable).
+        """
+        index = (key % self.buckets) * 2
+        deep = self._read(index)
+        deep_entry = self._entry(*deep) if deep is not None else None
+        if deep_entry is not None and deep_entry[0] == key and move is None:
+            move = deep_entry[4]
+        move_index = NO_MOVE if move is None else move[0] * self.size + move[1]
+        data = pack_data(score, depth, bound, move_index, self.age)
+        self.stores += 1
+        slot = index + 1
+        if (
+            deep_entry is None
+            or deep_entry[0] == key
+            or depth >= deep_entry[2]
+            or deep_entry[5] != self.age
+        ):
+            slot = index
+            if deep_entry is not None and deep_entry[0] != key:
+                self.overwrites += 1
+        else:
+            other = self._read(slot)
+            if other is not None and other[0] != key:
+                self.overwrites += 1
+        RECORD.pack_into(self.buf, HEADER.size + slot * RECORD.size, key ^ data, data)
+
+    def filled(self):
+        """Devuelve el número de ranuras ocupadas."""
+        return sum(1 for slot in range(self.capacity) if self._read(slot) is not None)
+
+    def stats(self):
+        """
+        Contadores de uso de este proceso, más la ocupación global de la tabla.
+        :return: Diccionario con aciertos, fallos, escrituras, sobrescrituras y ocupación.
+        """
+        probes = self.hits + self.misses
+        return {
+            "capacity": self.capacity,
+            "megabytes": len(self.buf) / (1024 * 1024),
+            "filled": self.filled(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / probes if probes else 0.0,
+            "stores": self.stores,
+            "overwrites": self.overwrites,
+        }